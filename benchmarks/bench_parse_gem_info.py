@@ -0,0 +1,68 @@
+"""
+parse_gem_info 마이크로 벤치마크 (BeautifulSoup 방식 vs 정규식 + 메모이제이션)
+사용법: 프로젝트 루트에서 python -m benchmarks.bench_parse_gem_info
+"""
+import timeit
+from bs4 import BeautifulSoup
+from services.lostark_api import parse_gem_info, parse_gem_name
+
+GEM_TYPES = ["겁화", "작열", "멸화", "홍염"]
+
+# 캐릭터 한 명 = 보석 11개, !원정대 한 번 = 캐릭터 6명
+EXPEDITION = [
+    [
+        {"Name": f"<P ALIGN='CENTER'><FONT COLOR='#E3C7A1'>{7 + (slot + character) % 4}레벨 "
+                 f"{GEM_TYPES[slot % 4]}의 보석</FONT></P>"}
+        for slot in range(11)
+    ]
+    for character in range(6)
+]
+
+
+def parse_gem_info_bs4(gems):
+    """기존 구현 (보석마다 BeautifulSoup 객체 생성)"""
+    if not gems:
+        return {}
+
+    gem_counts = {}
+    for gem in gems:
+        name_html = gem.get("Name", "")
+        soup = BeautifulSoup(name_html, "html.parser")
+        clean_name = soup.get_text()
+
+        if "레벨" in clean_name:
+            gem_level, gem_type = clean_name.split("레벨", 1)
+            gem_type = gem_type.split("의")[0].strip()
+            gem_level = gem_level.strip() + "레벨"
+
+            key = f"{gem_level} {gem_type}"
+            gem_counts[key] = gem_counts.get(key, 0) + 1
+
+    return gem_counts
+
+
+def run_expedition(parser):
+    for gems in EXPEDITION:
+        parser(gems)
+
+
+def main(number=200):
+    # 두 구현의 결과가 같은지 먼저 확인
+    for gems in EXPEDITION:
+        assert parse_gem_info(gems) == parse_gem_info_bs4(gems)
+
+    legacy = timeit.timeit(lambda: run_expedition(parse_gem_info_bs4), number=number)
+
+    parse_gem_name.cache_clear()
+    cold = timeit.timeit(lambda: (parse_gem_name.cache_clear(), run_expedition(parse_gem_info)), number=number)
+    warm = timeit.timeit(lambda: run_expedition(parse_gem_info), number=number)
+
+    per_call = lambda total: total / number * 1_000_000  # 명령어 1회당 마이크로초
+    print(f"!원정대 1회(보석 66개) 파싱, {number}회 반복")
+    print(f"BeautifulSoup        : {per_call(legacy):9.1f} us")
+    print(f"정규식 (캐시 초기화): {per_call(cold):9.1f} us  ({legacy / cold:.1f}x)")
+    print(f"정규식 + 메모이제이션: {per_call(warm):9.1f} us  ({legacy / warm:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,8 @@ from cogs.raid import RaidGuideCog
 from cogs.help import HelpCog
 from cogs.cleanup import CommandCleanupCog
 from cogs.inquiry import InquiryCog
+from cogs.apistatus import ApiStatusCog
+from services import lostark_api, youtube
 import os
 
 # 설정 파일 로드
@@ -29,10 +31,16 @@ database = Database(config["database"]["file"])
 TOKEN = config["bot"]["token"]
 PREFIX = config["bot"]["prefix"]
 
+class LostArkBot(commands.Bot):
+    async def close(self):
+        await lostark_api.shutdown()  # 로스트아크 API 커넥션 풀 및 디스크 캐시 정리
+        youtube.shutdown()  # 대기 중인 yt_dlp 추출 작업 취소
+        await super().close()
+
 intents = nextcord.Intents.default()
 intents.message_content = True
 intents.members = True  # 멤버 관련 이벤트 활성화
-bot = commands.Bot(command_prefix=PREFIX, intents=intents)
+bot = LostArkBot(command_prefix=PREFIX, intents=intents)
 
 database = Database("music_queue.db")
 
@@ -56,6 +64,10 @@ bot.add_cog(RaidGuideCog(bot))
 bot.add_cog(HelpCog(bot))
 bot.add_cog(CommandCleanupCog(bot))
 bot.add_cog(InquiryCog(bot))
+bot.add_cog(ApiStatusCog(bot))
+
+# 디스크에 남아 있는 API 응답으로 캐시 채우기
+lostark_api.warm_caches()
 
 #봇 실행
 bot.run(TOKEN)
\ No newline at end of file
@@ -1,7 +1,78 @@
 import nextcord
-from nextcord.ext import commands
+from nextcord.ext import commands, tasks
 from nextcord.ui import View, Select, Button
-from services.lostark_api import fetch_accessory_data
+from services.lostark_api import fetch_accessory_data, fetch_accessory_listings, config
+from services.accessory_snapshot import AccessorySnapshot
+from typing import NamedTuple
+import asyncio
+
+# 현재 페이지 앞뒤로 요청을 유지할 페이지 수
+PAGE_CACHE_RADIUS = 1
+
+ACCESSORY_CATEGORIES = {
+    "목걸이": 200010,
+    "귀걸이": 200020,
+    "반지": 200030
+}
+
+# 악세서리 스냅샷 모드 (settings.json의 accessory_snapshot.enabled로 사용 여부 설정)
+SNAPSHOT_CONFIG = config.get("accessory_snapshot", {})
+SNAPSHOT_INTERVAL_MINUTES = SNAPSHOT_CONFIG.get("interval_minutes", 10)
+
+# 옵션 드롭다운의 고정 항목
+PLACEHOLDER_OPTION = "선택해주세요"
+NO_OPTION = "선택 안 함"
+
+
+class AccessoryOption(NamedTuple):
+    """OPTIONS_MAP 항목 하나를 미리 계산해 둔 값"""
+    name: str  # "추가 피해(상)"
+    group: str  # "추가 피해" (같은 그룹은 한 번만 선택 가능)
+    tier: str  # "상" / "중" / "하", 등급이 없으면 None
+    second_option: int
+    min_value: int
+    max_value: int
+    etc_option: dict  # 검색 payload의 EtcOptions 항목
+    select_options: tuple  # (기본 선택 안 된 SelectOption, 기본 선택된 SelectOption)
+
+
+def build_select_options(label, description=None):
+    """default 여부만 다른 SelectOption 두 개를 미리 생성"""
+    return tuple(
+        nextcord.SelectOption(label=label, value=label, description=description, default=default)
+        for default in (False, True)
+    )
+
+
+def compile_options(options_map):
+    """{악세서리: {옵션명: 설정}} -> {악세서리: {옵션명: AccessoryOption}} (모듈 로드 시 한 번만 계산)"""
+    index = {}
+    for accessory, options in options_map.items():
+        index[accessory] = {}
+        for name, option_data in options.items():
+            group, _, tier = name.partition("(")
+            min_value = option_data["MinValue"] or 0
+            max_value = option_data.get("MaxValue") or 0
+            index[accessory][name] = AccessoryOption(
+                name=name,
+                group=group,
+                tier=tier.rstrip(")") or None,
+                second_option=option_data["SecondOption"],
+                min_value=min_value,
+                max_value=max_value,
+                etc_option={
+                    "FirstOption": 7,  # 고정값
+                    "SecondOption": option_data["SecondOption"],
+                    "MinValue": min_value,
+                    "MaxValue": max_value,
+                },
+                select_options=build_select_options(name),
+            )
+    return index
+
+
+PLACEHOLDER_SELECT_OPTIONS = build_select_options(PLACEHOLDER_OPTION, "옵션을 선택하세요")
+NO_OPTION_SELECT_OPTIONS = build_select_options(NO_OPTION, "옵션을 선택하지 않습니다")
 
 class PreviousPageButton(Button):
     def __init__(self, parent_view):
@@ -24,26 +95,63 @@ class NextPageButton(Button):
         await self.parent_view.fetch_and_display_results(interaction)
 
 class AccessorySearchView(View):
-    def __init__(self):
+    def __init__(self, snapshot=None):
         super().__init__(timeout=None)
+        self.snapshot = snapshot  # 있으면 스냅샷에서 먼저 검색
         self.selected_accessory = None
         self.selected_quality = "70"  # 기본 품질값
-        self.selected_options = ["선택해주세요"] * 3
+        self.selected_options = [PLACEHOLDER_OPTION] * 3
         self.selected_type = None  # 고대, 유물 선택
         self.step = 1  # 단계 관리
         self.page_no = 1  # 페이지 번호 추가
 
+        # 진행 중인 페이지 요청 (페이지 번호 -> 요청 Task), 검색 조건이 바뀌면 비움
+        # 끝난 요청은 재사용하지 않고 공유 검색 캐시(accessory_cache, 짧은 TTL)에 맡김
+        self.page_query = None
+        self.page_cache = {}
+        # 스냅샷으로 답하지 못해 API로 넘어간 검색 조건 (이후 페이지도 API로 조회해 순서가 섞이지 않게 함)
+        self.api_query = None
+
         # 초기 메뉴 추가: 품질 선택과 악세서리 선택
         self.add_item(QualitySelectMenu(self))
         self.add_item(AccessorySelectMenu(self))
 
+    def _page_task(self, page_no):
+        """페이지 검색 Task 반환 (진행 중인 요청이 없으면 새로 요청, 최근 결과는 공유 캐시에서 바로 반환됨)"""
+        task = self.page_cache.get(page_no)
+        if task is None or task.done():
+            task = asyncio.ensure_future(fetch_accessory_data(page_no=page_no, **self.page_query))
+            # 미리 가져온 페이지를 끝내 보지 않아도 예외 경고가 남지 않도록 결과 확인
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            self.page_cache[page_no] = task
+        return task
+
+    async def fetch_page(self, query, page_no):
+        """검색 결과 페이지 조회 (미리 요청 중인 페이지가 있으면 그 결과를 기다림)"""
+        if query != self.page_query:
+            for task in self.page_cache.values():
+                task.cancel()
+            self.page_query = query
+            self.page_cache = {}
+        return await asyncio.shield(self._page_task(page_no))
+
+    def prefetch_neighbors(self, results):
+        """현재 페이지 주변이 아닌 요청은 취소하고, 다음 페이지가 있으면 백그라운드로 미리 요청"""
+        for page_no in list(self.page_cache):
+            if abs(page_no - self.page_no) > PAGE_CACHE_RADIUS:
+                self.page_cache.pop(page_no).cancel()
+
+        page_size = results.get("PageSize") or len(results.get("Items") or [])
+        if page_size and self.page_no * page_size < (results.get("TotalCount") or 0):
+            self._page_task(self.page_no + 1)
+
     async def fetch_and_display_results(self, interaction):
         try:
             # 유효성 검사
-            valid_options = OptionSelectMenu.OPTIONS_MAP[self.selected_accessory].keys()
+            option_index = OPTION_INDEX[self.selected_accessory]
             invalid_options = [
                 option for option in self.selected_options
-                if option != "선택 안 함" and option not in valid_options
+                if option != NO_OPTION and option not in option_index
             ]
             if invalid_options:
                 await interaction.response.send_message(
@@ -56,38 +164,31 @@ class AccessorySearchView(View):
             item_grade_quality = int(self.selected_quality)
 
             # 카테고리 코드 설정
-            category_code_map = {
-                "목걸이": 200010,
-                "귀걸이": 200020,
-                "반지": 200030
-            }
-            category_code = category_code_map[self.selected_accessory]
+            category_code = ACCESSORY_CATEGORIES[self.selected_accessory]
 
             # 고대/유물 설정
             item_grade = self.selected_type if self.selected_accessory in ["목걸이", "귀걸이", "반지"] else ""
 
             # 옵션 매핑
-            etc_options = []
-            for option in self.selected_options:
-                if option != "선택 안 함":
-                    option_data = OptionSelectMenu.OPTIONS_MAP[self.selected_accessory][option]
-                    etc_options.append({
-                        "FirstOption": 7,  # 고정값
-                        "SecondOption": option_data["SecondOption"],
-                        "MinValue": option_data["MinValue"] or 0,
-                        "MaxValue": option_data["MaxValue"] or 0,
-                    })
-
-            # API 호출
-            results = await fetch_accessory_data(
-                page_no=self.page_no,
-                item_grade_quality=item_grade_quality,
-                category_code=category_code,
-                item_grade=item_grade,
-                etc_options=etc_options
-            )
-
-
+            selected = [option_index[option] for option in self.selected_options if option != NO_OPTION]
+            etc_options = [option.etc_option for option in selected]
+
+            # 스냅샷으로 처리할 수 없으면 API 호출 (미리 가져온 페이지가 있으면 바로 사용)
+            query = {
+                "item_grade_quality": item_grade_quality,
+                "category_code": category_code,
+                "item_grade": item_grade,
+                "etc_options": etc_options
+            }
+            results = None
+            if self.snapshot is not None and query != self.api_query:
+                results = self.snapshot.search(
+                    category_code, item_grade, item_grade_quality, selected, self.page_no
+                )
+            if results is None:
+                self.api_query = query
+                results = await self.fetch_page(query, self.page_no)
+                self.prefetch_neighbors(results)
 
             # 결과 처리
             items = results.get("Items", [])
@@ -187,7 +288,7 @@ class AccessorySearchView(View):
             self.add_item(AccessoryTypeSelectMenu(self))
 
         elif self.step == 4:
-            options = [opt for opt in self.selected_options if opt != "선택 안 함"]
+            options = [opt for opt in self.selected_options if opt != NO_OPTION]
             embed.title = "📊 선택된 조건"
             embed.description = (
                 f"선택된 악세서리: {self.selected_accessory}\n"
@@ -317,46 +418,25 @@ class OptionSelectMenu(Select):
     def __init__(self, parent_view, slot):
         self.parent_view = parent_view
         self.slot = slot
-        accessory_type = parent_view.selected_accessory
+        option_index = OPTION_INDEX[parent_view.selected_accessory]
         selected_options = parent_view.selected_options
+        current = selected_options[slot]
 
         # 이미 선택된 옵션의 그룹명을 추적
-        already_selected_groups = [
-            option.split("(")[0]
+        already_selected_groups = {
+            option_index[option].group
             for idx, option in enumerate(selected_options)
-            if idx != slot and option not in ["선택해주세요", "선택 안 함"]
-        ]
-
-        # 드롭다운 옵션 생성 (이미 선택된 그룹은 제외)
-        options = [
-            nextcord.SelectOption(
-                label=option,
-                value=option,
-                description=None,
-                default=selected_options[slot] == option,
-            )
-            for option in self.OPTIONS_MAP[accessory_type]
-            if option.split("(")[0] not in already_selected_groups or selected_options[slot] == option
-        ]
-
-        # "선택해주세요"와 "선택 안 함" 옵션 추가
-        options.insert(
-            0,
-            nextcord.SelectOption(
-                label="선택해주세요",
-                value="선택해주세요",
-                description="옵션을 선택하세요",
-                default=selected_options[slot] == "선택해주세요",
-            ),
-        )
-        options.append(
-            nextcord.SelectOption(
-                label="선택 안 함",
-                value="선택 안 함",
-                description="옵션을 선택하지 않습니다",
-                default=selected_options[slot] == "선택 안 함",
-            ),
+            if idx != slot and option in option_index
+        }
+
+        # 드롭다운 옵션 생성 (이미 선택된 그룹은 제외, 미리 만들어 둔 SelectOption 사용)
+        options = [PLACEHOLDER_SELECT_OPTIONS[current == PLACEHOLDER_OPTION]]
+        options.extend(
+            option.select_options[current == name]
+            for name, option in option_index.items()
+            if option.group not in already_selected_groups or current == name
         )
+        options.append(NO_OPTION_SELECT_OPTIONS[current == NO_OPTION])
 
         super().__init__(placeholder=f"옵션 {slot + 1}을 선택하세요", min_values=1, max_values=1, options=options)
 
@@ -366,12 +446,12 @@ class OptionSelectMenu(Select):
 
         # 검증 및 다음 단계 진행
         if all(
-            option in self.OPTIONS_MAP[self.parent_view.selected_accessory]
-            or option == "선택 안 함"
+            option in OPTION_INDEX[self.parent_view.selected_accessory]
+            or option == NO_OPTION
             for option in self.parent_view.selected_options
         ):
             # 모든 드롭다운이 유효하면 다음 단계로 이동
-            if "선택해주세요" not in self.parent_view.selected_options:
+            if PLACEHOLDER_OPTION not in self.parent_view.selected_options:
                 if self.parent_view.selected_accessory == "반지":
                     # 반지를 선택한 경우 고대/유물 선택 없이 바로 네 번째 단계로 이동
                     self.parent_view.step = 3
@@ -390,6 +470,10 @@ class OptionSelectMenu(Select):
                 self.parent_view.add_item(OptionSelectMenu(self.parent_view, slot))
             await self.parent_view.update_message(interaction)
 
+
+OPTION_INDEX = compile_options(OptionSelectMenu.OPTIONS_MAP)
+
+
 class AccessoryTypeSelectMenu(Select):
     def __init__(self, parent_view):
         options = [
@@ -412,10 +496,36 @@ class AccessoryCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+        # 스냅샷 모드: 카테고리 전체를 주기적으로 수집해 두고 검색은 로컬에서 처리
+        self.snapshot = None
+        if SNAPSHOT_CONFIG.get("enabled"):
+            self.snapshot = AccessorySnapshot(max_age=SNAPSHOT_INTERVAL_MINUTES * 60 * 2)
+            self.sweep_accessories.start()
+
+    def cog_unload(self):
+        self.sweep_accessories.cancel()
+
+    @tasks.loop(minutes=SNAPSHOT_INTERVAL_MINUTES)
+    async def sweep_accessories(self):
+        """악세서리 카테고리별 매물을 수집해 스냅샷 갱신"""
+        for name, category_code in ACCESSORY_CATEGORIES.items():
+            try:
+                items, complete = await fetch_accessory_listings(category_code, max_pages=SNAPSHOT_CONFIG.get("max_pages", 30))
+            except Exception as e:
+                print(f"⚠️ 악세서리 스냅샷 수집 실패 ({name}): {e}")
+                continue
+            self.snapshot.replace(category_code, items, complete)
+            print(f"✅ 악세서리 스냅샷 갱신: {name} {len(items)}개{'' if complete else ' (최저가 일부)'}")
+
+    @sweep_accessories.before_loop
+    async def before_sweep_accessories(self):
+        """봇이 준비될 때까지 기다리기"""
+        await self.bot.wait_until_ready()
+
     @commands.command(name="악세")
     async def accessory_search(self, ctx):
         """악세서리 검색 명령어"""
-        view = AccessorySearchView()
+        view = AccessorySearchView(self.snapshot)
         embed = nextcord.Embed(
             title="🛠️ 어떤 악세서리를 찾고 싶으신가요?",
             description=(
@@ -0,0 +1,61 @@
+import nextcord
+from nextcord.ext import commands
+from services.lostark_api import client, CACHES
+
+
+def mask_key(api_key):
+    """API 키는 끝 4자리만 표시"""
+    return f"...{api_key[-4:]}" if api_key else "(없음)"
+
+
+class ApiStatusCog(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    @commands.command(name="api상태")
+    @commands.has_permissions(administrator=True)
+    async def api_status(self, ctx):
+        """로스트아크 API 키별 사용률 및 요청 예산 현황"""
+        stats = client.stats()
+        embed = nextcord.Embed(title="📡 로스트아크 API 상태", color=nextcord.Color.red())
+
+        for api_key, bucket in stats.items():
+            status = f"⛔ 격리 중 ({bucket['quarantined_for']:.0f}초 남음)" if bucket["quarantined_for"] else "✅ 사용 가능"
+            embed.add_field(
+                name=f"🔑 {mask_key(api_key)} - {status}",
+                value=(
+                    f"사용률: {bucket['share']:.1f}%\n"
+                    f"대기열: {bucket['queue_depth']}건\n"
+                    f"남은 토큰: {bucket['tokens']} / {bucket['capacity']}\n"
+                    f"요청 수: {bucket['requests']}회 (429: {bucket['throttled']}회)\n"
+                    f"평균 대기: {bucket['avg_wait']:.2f}초 / 최대 대기: {bucket['max_wait']:.2f}초\n"
+                    f"차단 남은 시간: {bucket['blocked_for']:.1f}초"
+                ),
+                inline=False
+            )
+
+        # 응답 캐시 적중률
+        cache_lines = []
+        for cache in CACHES:
+            cache_stats = cache.stats()
+            cache_lines.append(
+                f"**{cache.name}**: {cache_stats['size']}/{cache_stats['maxsize']}개, "
+                f"적중률 {cache_stats['hit_rate']:.1f}% (stale {cache_stats['stale_hits']}회, 중복 요청 합침 {cache_stats['coalesced']}회)"
+            )
+        embed.add_field(name="🗃️ 캐시", value="\n".join(cache_lines), inline=False)
+
+        # !닉네임 아머리 엔드포인트별 평균 응답 시간
+        character_cog = self.bot.get_cog("CharacterCog")
+        if character_cog:
+            timing_lines = [
+                f"**{name}**: 평균 {sum(timings) / len(timings):.2f}초 / 최대 {max(timings):.2f}초 (최근 {len(timings)}회)"
+                for name, timings in character_cog.endpoint_timings.items() if timings
+            ]
+            if timing_lines:
+                embed.add_field(name="⏱️ 아머리 응답 시간", value="\n".join(timing_lines), inline=False)
+
+        await ctx.send(embed=embed, delete_after=60)
+
+
+def setup(bot: commands.Bot):
+    bot.add_cog(ApiStatusCog(bot))
@@ -1,11 +1,69 @@
 import nextcord
-from nextcord.ext import commands
-from services.lostark_api import fetch_auction_gem_data, fetch_markets_engraving_data, fetch_markets_enhance_data
+from nextcord.ext import commands, tasks
+from services.lostark_api import (
+    fetch_auction_gem_data, fetch_markets_engraving_data, fetch_markets_enhance_data, fetch_all_engraving_markets
+)
+from services.cache import AsyncTTLCache
+from utils.price_history_db import PriceHistoryDatabase
+from datetime import datetime, timedelta, timezone
+import asyncio
+import heapq
+import time
+
+# 시세 수집 주기(분)와 동시 요청 수
+PRICE_POLL_MINUTES = 5
+PRICE_POLL_CONCURRENCY = 4
+# 수집 주기의 2배가 지나도록 갱신되지 않은 시세는 사용하지 않음
+PRICE_MAX_AGE = PRICE_POLL_MINUTES * 60 * 2
+
+GEM_LEVELS = range(1, 11)
+GEM_TYPES = ("겁화", "작열", "멸화", "홍염")
+ENHANCE_MATERIALS = ("운명", "아비도스")
+
+# !보석시세 표 캐시 시간(초)
+GEM_MATRIX_TTL = 60
+
+# !시세추이 기본/최대 조회 기간(일)
+HISTORY_DEFAULT_DAYS = 7
+HISTORY_MAX_DAYS = 90
+KST = timezone(timedelta(hours=9))
+
+
+def cheapest_buy_price(listings):
+    """fetch_auction_gem_data 결과 중 최저가 (매물이 없으면 None)"""
+    return min(listing.buy_price for listing in listings) if listings else None
+
+
+def format_gem_matrix(matrix):
+    """{(레벨, 종류): 가격} -> 고정폭 표 (한글은 2칸으로 계산해 정렬)"""
+    width = 11
+    header = "Lv " + "".join(" " * (width - len(gem_type) * 2) + gem_type for gem_type in GEM_TYPES)
+    lines = [header]
+    for level in GEM_LEVELS:
+        cells = []
+        for gem_type in GEM_TYPES:
+            price = matrix.get((level, gem_type))
+            cells.append(f"{price:>{width},}" if price is not None else f"{'-':>{width}}")
+        lines.append(f"{level:>2} " + "".join(cells))
+    return "\n".join(lines)
+
+
+def engraving_name_of(item_name):
+    """마켓 아이템 이름("유물 원한 각인서")에서 각인명("원한") 추출"""
+    name = item_name.removesuffix("각인서").strip()
+    return name.removeprefix("유물").strip()
+
 
 class AuctionCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+        # 시세 인덱스: ("gem", 레벨, 종류) / ("engraving", 각인명) / ("engraving_market",) / ("enhance", 재료명)
+        #            -> (값, 수집 시각)
+        self.price_index = {}
+        self.history_db = PriceHistoryDatabase()
+        self.gem_matrix_cache = AsyncTTLCache("gem_matrix", ttl=GEM_MATRIX_TTL, maxsize=1)
+
         # 유효한 각인서 목록
         self.valid_engravings = {
             "각성", "강령술", "강화 방패", "결투의 대가", "구슬동자", "굳은 의지", "급소 타격", "기습의 대가", "기습구조", 
@@ -16,6 +74,103 @@ class AuctionCog(commands.Cog):
             "최대 마나 증가", "추진력", "타격의 대가", "탈출의 명수", "폭발물 전문가"
         }
 
+        self.poll_prices.start()  # 시세 수집 태스크 시작
+
+    def cog_unload(self):
+        self.poll_prices.cancel()
+        self.history_db.close()
+
+    def get_indexed_price(self, key):
+        """시세 인덱스에서 값 조회 (없거나 오래되었으면 None)"""
+        entry = self.price_index.get(key)
+        if entry is None or time.time() - entry[1] > PRICE_MAX_AGE:
+            return None
+        return entry[0]
+
+    def price_watchlist(self):
+        """주기적으로 수집할 (인덱스 키, 요청 함수, 응답 변환 함수) 목록 (각인서는 _poll_engravings에서 한 번에 수집)"""
+        watchlist = []
+        for level in GEM_LEVELS:
+            for gem_type in GEM_TYPES:
+                watchlist.append((
+                    ("gem", level, gem_type),
+                    lambda level=level, gem_type=gem_type: fetch_auction_gem_data(level, gem_type),
+                    cheapest_buy_price
+                ))
+        for material in ENHANCE_MATERIALS:
+            watchlist.append((
+                ("enhance", material),
+                lambda material=material: fetch_markets_enhance_data(material),
+                lambda data: [(item["Name"], item["CurrentMinPrice"]) for item in data.get("Items") or []] or None
+            ))
+        return watchlist
+
+    async def _poll_price(self, semaphore, key, fetch, extract):
+        async with semaphore:
+            try:
+                value = extract(await fetch())
+            except Exception as e:
+                print(f"⚠️ 시세 수집 실패 {key}: {e}")
+                return
+        if value is not None:
+            self.price_index[key] = (value, time.time())
+
+    async def _poll_engravings(self):
+        """유각 카테고리 전체 조회 1회로 각인서별 최저가와 전체 목록을 인덱스에 저장"""
+        try:
+            items = await fetch_all_engraving_markets()
+        except Exception as e:
+            print(f"⚠️ 시세 수집 실패 ('engraving_market',): {e}")
+            return
+
+        now = time.time()
+        listing = [(item["Name"], item["CurrentMinPrice"]) for item in items]
+        if listing:
+            self.price_index[("engraving_market",)] = (listing, now)
+        for name, price in listing:
+            engraving_name = engraving_name_of(name)
+            if engraving_name in self.valid_engravings and price:
+                self.price_index[("engraving", engraving_name)] = (price, now)
+
+    @tasks.loop(minutes=PRICE_POLL_MINUTES)
+    async def poll_prices(self):
+        """관심 품목 시세를 주기적으로 수집해 인덱스에 저장"""
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(PRICE_POLL_CONCURRENCY)
+        watchlist = self.price_watchlist()
+        await asyncio.gather(
+            self._poll_engravings(),
+            *[self._poll_price(semaphore, key, fetch, extract) for key, fetch, extract in watchlist]
+        )
+        print(f"✅ 시세 수집 완료: {len(watchlist)}개 품목 + 유각 전체, {time.monotonic() - started:.1f}초")
+        self.record_price_history()
+
+    def record_price_history(self):
+        """이번 수집에서 갱신된 보석/각인서 시세를 시계열 저장소에 기록"""
+        now = time.time()
+        samples = {}
+        for key, (value, updated_at) in self.price_index.items():
+            if now - updated_at > PRICE_POLL_MINUTES * 60:
+                continue  # 이번 수집에서 실패한 품목
+            if key[0] == "gem":
+                samples[f"gem:{key[1]}:{key[2]}"] = value
+            elif key[0] == "engraving":
+                samples[f"engraving:{key[1]}"] = value
+
+        try:
+            if samples:
+                self.history_db.add_samples(samples, ts=now)
+            # 하루에 한 번 보존 기간이 지난 데이터 정리
+            if self.poll_prices.current_loop % (24 * 60 // PRICE_POLL_MINUTES) == 0:
+                self.history_db.prune()
+        except Exception as e:
+            print(f"⚠️ 시세 기록 중 오류 발생: {e}")
+
+    @poll_prices.before_loop
+    async def before_poll_prices(self):
+        """봇이 준비될 때까지 기다리기"""
+        await self.bot.wait_until_ready()
+
     @commands.command(name="보석")
     async def gem_search(self, ctx, level: int, gem_type: str):
         """
@@ -34,29 +189,72 @@ class AuctionCog(commands.Cog):
                 await ctx.send("⚠️ 유효하지 않은 보석 종류입니다. (겁화, 작열, 멸화, 홍염 중 하나를 선택하세요.)")
                 return
 
-            # 경매장 데이터 검색
-            gem_data = await fetch_auction_gem_data(level, gem_type)
-
-            # 최저가 검색
-            items = gem_data.get("Items", [])
-            if not items:
-                await ctx.send(f"❌ {level}레벨 {gem_type} 보석의 데이터를 찾을 수 없습니다.")
-                return
-
-            # 최저가 아이템 추출
-            cheapest_item = min(items, key=lambda x: x["AuctionInfo"]["BuyPrice"])
-            cheapest_price = cheapest_item["AuctionInfo"]["BuyPrice"]
+            # 시세 인덱스에 없으면 경매장 데이터 검색
+            cheapest_price = self.get_indexed_price(("gem", level, gem_type))
+            if cheapest_price is None:
+                cheapest_price = cheapest_buy_price(await fetch_auction_gem_data(level, gem_type))
+                if cheapest_price is None:
+                    await ctx.send(f"❌ {level}레벨 {gem_type} 보석의 데이터를 찾을 수 없습니다.")
+                    return
 
             await ctx.send(f"💎 {level}레벨 {gem_type}의 최저가는 {cheapest_price:,} 골드입니다.")
         except Exception as e:
             await ctx.send(f"⚠️ 보석 검색 중 오류가 발생했습니다: {e}")
 
+    async def build_gem_matrix(self):
+        """레벨 x 종류 보석 최저가 표 (인덱스에 없는 칸만 동시에 요청, 전부 실패하면 None)"""
+        semaphore = asyncio.Semaphore(PRICE_POLL_CONCURRENCY)
+        cells = [(level, gem_type) for level in GEM_LEVELS for gem_type in GEM_TYPES]
+
+        async def fetch_cell(level, gem_type):
+            price = self.get_indexed_price(("gem", level, gem_type))
+            if price is not None:
+                return price
+            async with semaphore:
+                try:
+                    listings = await fetch_auction_gem_data(level, gem_type)
+                except Exception as e:
+                    print(f"⚠️ 보석 시세 조회 실패 {level}레벨 {gem_type}: {e}")
+                    return None
+            return cheapest_buy_price(listings)
+
+        prices = await asyncio.gather(*[fetch_cell(level, gem_type) for level, gem_type in cells])
+        if all(price is None for price in prices):
+            return None
+        return dict(zip(cells, prices))
+
+    @commands.command(name="보석시세")
+    async def gem_price_matrix(self, ctx):
+        """
+        레벨별/종류별 보석 최저가를 한 번에 표로 보여줍니다.
+        사용법: !보석시세
+        """
+        try:
+            matrix = await self.gem_matrix_cache.get("matrix", self.build_gem_matrix)
+            if matrix is None:
+                await ctx.send("❌ 경매장에서 보석 데이터를 찾을 수 없습니다.")
+                return
+
+            embed = nextcord.Embed(
+                title="💎 보석 최저가 시세표",
+                description=f"```\n{format_gem_matrix(matrix)}\n```",
+                color=nextcord.Color.blue()
+            )
+            embed.set_footer(text="단위: 골드 / - : 즉시 구매 매물 없음")
+            await ctx.send(embed=embed)
+        except Exception as e:
+            await ctx.send(f"⚠️ 보석 시세를 가져오는 중 오류가 발생했습니다: {e}")
+
     @commands.command(name="유각")
     async def engraving_search(self, ctx, *, engraving_name: str):
         """
         경매장에서 각인서 최저가 검색
-        사용법: !유각 [각인명]
+        사용법: !유각 [각인명] 또는 !유각 [각인명], [각인명], ...
         """
+        if "," in engraving_name:
+            await self.engraving_batch_search(ctx, [name.strip() for name in engraving_name.split(",")])
+            return
+
         try:
             engraving_name = engraving_name.strip()  # 공백 제거
 
@@ -65,23 +263,61 @@ class AuctionCog(commands.Cog):
                 await ctx.send("⚠️ 유효하지 않은 각인서 이름입니다. 정확한 이름을 입력해주세요.")
                 return
 
-            # 경매장 데이터 검색
-            engraving_data = await fetch_markets_engraving_data(engraving_name)
+            # 시세 인덱스에 없으면 경매장 데이터 검색
+            current_min_price = self.get_indexed_price(("engraving", engraving_name))
+            if current_min_price is None:
+                engraving_data = await fetch_markets_engraving_data(engraving_name)
 
-            # 각인서 데이터 확인
-            items = engraving_data.get("Items", [])
-            if not items:
-                await ctx.send(f"❌ '{engraving_name}' 각인서의 데이터를 찾을 수 없습니다.")
-                return
+                # 각인서 데이터 확인
+                items = engraving_data.get("Items", [])
+                if not items:
+                    await ctx.send(f"❌ '{engraving_name}' 각인서의 데이터를 찾을 수 없습니다.")
+                    return
 
-            # 최저가 아이템 추출
-            cheapest_item = items[0]  # API 응답은 최저가 순으로 정렬된다고 가정
-            current_min_price = cheapest_item["CurrentMinPrice"]
+                # 최저가 아이템 추출
+                cheapest_item = items[0]  # API 응답은 최저가 순으로 정렬된다고 가정
+                current_min_price = cheapest_item["CurrentMinPrice"]
 
             await ctx.send(f"📜 '{engraving_name}' 각인의 최저가는 {current_min_price:,} 골드입니다.")
         except Exception as e:
             await ctx.send(f"⚠️ 각인서 검색 중 오류가 발생했습니다: {e}")
 
+    async def engraving_batch_search(self, ctx, engraving_names):
+        """여러 각인서 최저가를 한 번에 검색 (유각 카테고리 전체 조회 1회로 처리)"""
+        try:
+            engraving_names = list(dict.fromkeys(name for name in engraving_names if name))  # 중복 제거
+            invalid = [name for name in engraving_names if name not in self.valid_engravings]
+            if invalid:
+                await ctx.send(f"⚠️ 유효하지 않은 각인서 이름입니다: {', '.join(invalid)}")
+                return
+            if len(engraving_names) > 25:  # 임베드 필드 개수 제한
+                await ctx.send("⚠️ 한 번에 최대 25개의 각인서만 검색할 수 있습니다.")
+                return
+
+            # 시세 인덱스에 없는 각인서만 카테고리 전체 조회 결과에서 찾기
+            prices = {name: self.get_indexed_price(("engraving", name)) for name in engraving_names}
+            missing = [name for name, price in prices.items() if price is None]
+            if missing:
+                listing = {}
+                for item in await fetch_all_engraving_markets():
+                    name = engraving_name_of(item["Name"])
+                    if name in self.valid_engravings and item.get("CurrentMinPrice"):
+                        listing[name] = item["CurrentMinPrice"]
+                for name in missing:
+                    prices[name] = listing.get(name)
+
+            embed = nextcord.Embed(
+                title="📜 유물 각인서 최저가",
+                color=nextcord.Color.gold()
+            )
+            for name, price in prices.items():
+                value = f"{price:,} 골드" if price is not None else "❌ 데이터 없음"
+                embed.add_field(name=name, value=value, inline=True)
+
+            await ctx.send(embed=embed)
+        except Exception as e:
+            await ctx.send(f"⚠️ 각인서 검색 중 오류가 발생했습니다: {e}")
+
     @commands.command(name="유각시세")
     async def top_engraving_prices(self, ctx):
         """
@@ -89,17 +325,18 @@ class AuctionCog(commands.Cog):
         사용법: !유각시세
         """
         try:
-            # 유각 전체 데이터를 가져오기 위해 빈 이름으로 요청
-            engraving_data = await fetch_markets_engraving_data("")
-            
+            # 시세 인덱스에 없으면 유각 카테고리 전체 페이지 조회
+            items = self.get_indexed_price(("engraving_market",))
+            if items is None:
+                items = [(item["Name"], item["CurrentMinPrice"]) for item in await fetch_all_engraving_markets()]
+
             # 각인서 데이터 확인
-            items = engraving_data.get("Items", [])
             if not items:
                 await ctx.send("❌ 경매장에서 유효한 각인서 데이터를 찾을 수 없습니다.")
                 return
 
-            # 상위 10개 정렬 (현재 최저가 기준 내림차순 정렬)
-            sorted_items = sorted(items, key=lambda x: x["CurrentMinPrice"], reverse=True)[:10]
+            # 상위 10개 추출 (현재 최저가 기준 내림차순, 전체 정렬 대신 힙 사용)
+            sorted_items = heapq.nlargest(10, items, key=lambda x: x[1])
 
             # 임베드 생성
             embed = nextcord.Embed(
@@ -109,9 +346,7 @@ class AuctionCog(commands.Cog):
             )
 
             # 정렬된 각인서 데이터를 임베드에 추가
-            for idx, item in enumerate(sorted_items, start=1):
-                name = item["Name"]
-                price = item["CurrentMinPrice"]
+            for idx, (name, price) in enumerate(sorted_items, start=1):
                 if idx == 10:
                     idx_display = "1️⃣0️⃣"  # 10번째는 숫자를 이모티콘으로 분리
                 else:
@@ -123,14 +358,73 @@ class AuctionCog(commands.Cog):
         except Exception as e:
             await ctx.send(f"⚠️ 유각 시세를 가져오는 중 오류가 발생했습니다: {e}")
 
+    @commands.command(name="시세추이")
+    async def price_history(self, ctx, *, query: str):
+        """
+        보석/각인서의 최근 N일 시세 추이 (최저/평균/최고)
+        사용법: !시세추이 [레벨] [보석종류] [일수] 또는 !시세추이 [각인명] [일수]
+        """
+        try:
+            tokens = query.split()
+            days = HISTORY_DEFAULT_DAYS
+            if len(tokens) > 1 and tokens[-1].isdigit() and not (len(tokens) == 2 and tokens[1] in GEM_TYPES):
+                days = int(tokens.pop())
+            days = max(1, min(days, HISTORY_MAX_DAYS))
+
+            if len(tokens) == 2 and tokens[0].isdigit() and tokens[1] in GEM_TYPES:
+                item_key = f"gem:{int(tokens[0])}:{tokens[1]}"
+                item_label = f"{int(tokens[0])}레벨 {tokens[1]}"
+            elif " ".join(tokens) in self.valid_engravings:
+                item_key = f"engraving:{' '.join(tokens)}"
+                item_label = f"{' '.join(tokens)} 각인서"
+            else:
+                await ctx.send("⚠️ 보석(예: `!시세추이 10 겁화 7`) 또는 각인서(예: `!시세추이 원한 7`)를 입력해주세요.")
+                return
+
+            summary = self.history_db.get_summary(item_key, days)
+            if summary is None:
+                await ctx.send(f"❌ {item_label}의 시세 기록이 아직 없습니다.")
+                return
+
+            min_price, avg_price, max_price, samples = summary
+            embed = nextcord.Embed(
+                title=f"📈 {item_label} 최근 {days}일 시세",
+                description=(
+                    f"최저가: **{min_price:,}** 골드\n"
+                    f"평균가: **{avg_price:,.0f}** 골드\n"
+                    f"최고가: **{max_price:,}** 골드"
+                ),
+                color=nextcord.Color.red()
+            )
+
+            # 일별 추이 (최근 14일까지만 표시)
+            daily_lines = [
+                f"{datetime.fromtimestamp(bucket, KST).strftime('%m/%d')}  "
+                f"{day_min:,} / {day_avg:,.0f} / {day_max:,}"
+                for bucket, day_min, day_avg, day_max in self.history_db.get_daily(item_key, days)[-14:]
+            ]
+            if daily_lines:
+                embed.add_field(name="일별 (최저 / 평균 / 최고)", value="\n".join(daily_lines), inline=False)
+            embed.set_footer(text=f"{samples}개 샘플 기준 · {PRICE_POLL_MINUTES}분 간격 수집")
+
+            await ctx.send(embed=embed)
+        except Exception as e:
+            await ctx.send(f"⚠️ 시세 추이를 가져오는 중 오류가 발생했습니다: {e}")
+
     @commands.command(name="강화재료")
     async def enhance_items_prices(self, ctx):
 
         try:
-            enhance_data = await fetch_markets_enhance_data("운명")
-            fusion_data = await fetch_markets_enhance_data("아비도스")
-            enhance_item = enhance_data.get("Items", [])
-            fusion_item = fusion_data.get("Items", [])
+            # 시세 인덱스에 없으면 경매장 데이터 검색
+            enhance_item = self.get_indexed_price(("enhance", "운명"))
+            if enhance_item is None:
+                enhance_data = await fetch_markets_enhance_data("운명")
+                enhance_item = [(item["Name"], item["CurrentMinPrice"]) for item in enhance_data.get("Items") or []]
+
+            fusion_item = self.get_indexed_price(("enhance", "아비도스"))
+            if fusion_item is None:
+                fusion_data = await fetch_markets_enhance_data("아비도스")
+                fusion_item = [(item["Name"], item["CurrentMinPrice"]) for item in fusion_data.get("Items") or []]
             if not enhance_item:
                 await ctx.send("❌ 경매장에서 유효한 각인서 데이터를 찾을 수 없습니다.")
                 return
@@ -146,14 +440,10 @@ class AuctionCog(commands.Cog):
                 color=nextcord.Color.red()
             )
 
-            for idx, item in enumerate(enhance_item, start=1):
-                name = item["Name"]
-                price = item["CurrentMinPrice"]
+            for name, price in enhance_item:
                 embed.add_field(name=f"\u200b{name}  {price:,}골드", value="", inline=False)
             
-            for idx, item in enumerate(fusion_item, start=1):
-                name = item["Name"]
-                price = item["CurrentMinPrice"]
+            for name, price in fusion_item:
                 embed.add_field(name=f"\u200b{name}  {price:,}골드", value="", inline=False)
 
             await ctx.send(embed=embed)
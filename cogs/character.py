@@ -1,46 +1,118 @@
 import nextcord
 from nextcord.ext import commands
+from collections import deque
+import asyncio
+import time
 from services.lostark_api import (
     fetch_character_siblings,
-    fetch_character_profile,
-    fetch_character_gems,
-    fetch_character_cards,
+    fetch_character_armory,
     parse_gem_info,
     parse_card_info
 )
 
+# !닉네임 조회 전체 제한 시간 (초)
+ARMORY_DEADLINE = 8
+# !원정대 조회 시 동시에 조회할 캐릭터 수
+EXPEDITION_CONCURRENCY = 3
+
+
 class CharacterCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # 아머리 엔드포인트별 최근 응답 시간 (초)
+        self.endpoint_timings = {
+            name: deque(maxlen=100) for name in ("siblings", "armory")
+        }
+
+    async def _timed(self, name, coro, timings):
+        """요청 소요 시간을 엔드포인트별로 기록 (이번 호출의 값은 timings에도 저장)"""
+        started = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            timings[name] = time.perf_counter() - started
+            self.endpoint_timings[name].append(timings[name])
+
+    async def fetch_armory(self, character_name, deadline=ARMORY_DEADLINE):
+        """
+        형제 정보와 통합 아머리(프로필/보석/카드) 정보를 동시에 요청합니다.
+        제한 시간 안에 끝나지 않았거나 실패한 항목은 None, 시간 초과된 항목 이름은 timed_out에 담아 반환합니다.
+        """
+        elapsed = {}  # 이 조회의 엔드포인트별 소요 시간 (동시에 실행 중인 다른 조회와 섞이지 않도록 따로 보관)
+        tasks = {
+            "siblings": asyncio.ensure_future(self._timed("siblings", fetch_character_siblings(character_name), elapsed)),
+            "armory": asyncio.ensure_future(self._timed("armory", fetch_character_armory(character_name), elapsed)),
+        }
+        done, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+        for task in pending:
+            task.cancel()
+
+        results = {}
+        timed_out = set()
+        for name, task in tasks.items():
+            if task in pending:
+                timed_out.add(name)
+                results[name] = None
+            elif task.exception() is not None:
+                print(f"⚠️ {name} 정보 조회 실패: {task.exception()}")
+                results[name] = None
+            else:
+                results[name] = task.result()
+
+        timings = " / ".join(
+            f"{name} {elapsed[name]:.2f}s" if name not in timed_out else f"{name} 시간 초과"
+            for name in tasks
+        )
+        print(f"🔍 [DEBUG] '{character_name}' 아머리 조회: {timings}")
+        return results, timed_out
+
+    async def _fetch_character_details(self, character_name, semaphore):
+        """통합 아머리(프로필/보석/카드) 정보를 가져옴 (실패하면 None)"""
+        async with semaphore:
+            try:
+                return await fetch_character_armory(character_name)
+            except Exception as e:
+                print(f"⚠️ '{character_name}' 정보 조회 실패: {e}")
+                return None
 
     @commands.command(name="닉네임")
     async def character_info(self, ctx, *, character_name: str):
         """로스트아크 캐릭터 정보 조회"""
         try:
-            # 캐릭터 데이터 가져오기
-            siblings = await fetch_character_siblings(character_name)
-            profile = await fetch_character_profile(character_name)
-            gems_data = await fetch_character_gems(character_name)
-            cards_data = await fetch_character_cards(character_name)  # 카드 정보 추가
+            # 캐릭터 데이터 동시 요청
+            results, timed_out = await self.fetch_armory(character_name)
+            siblings = results["siblings"]
+            armory = results["armory"] or {}
+            profile = armory.get("ArmoryProfile")
+
+            # 프로필 요청이 실패했으면 형제 목록에 있는 기본 정보로 대체
+            if not profile and siblings:
+                profile = next(
+                    (sibling for sibling in siblings if sibling.get("CharacterName") == character_name),
+                    None
+                )
 
-            if not siblings or not profile:
+            if not profile:
                 await ctx.send(f"❌ '{character_name}' 캐릭터 정보를 찾을 수 없습니다.", delete_after=300)
                 return
 
             # 보석 정보 파싱
-            gems = parse_gem_info(gems_data.get("Gems", []))
-            gems_description = " / ".join(
-                [f"{gem} {count}개" for gem, count in gems.items()]
-            ) if gems else "보석 정보 없음"
+            gems = parse_gem_info(armory)
+            if "armory" in timed_out:
+                gems_description = "⏱️ 응답 지연으로 불러오지 못했습니다"
+            else:
+                gems_description = " / ".join(
+                    [f"{gem} {count}개" for gem, count in gems.items()]
+                ) if gems else "보석 정보 없음"
 
             # 카드 정보 파싱
-            card_info = parse_card_info(cards_data)
+            if "armory" in timed_out:
+                card_info = "⏱️ 응답 지연으로 불러오지 못했습니다"
+            else:
+                card_info = parse_card_info(armory)
 
             # 캐릭터 정보
-            if profile is None:
-                character_image = None
-            else:
-                character_image = profile.get("CharacterImage", None)
+            character_image = profile.get("CharacterImage", None)
             character_name = profile.get("CharacterName", "알 수 없음")
             item_level = profile.get("ItemMaxLevel", "알 수 없음")
             character_class = profile.get("CharacterClassName", "알 수 없음")
@@ -96,25 +168,33 @@ class CharacterCog(commands.Cog):
             
             emoji_numbers = ["1️⃣", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣"]
 
-            # 최대 6개의 캐릭터만 처리
-            for idx, character in enumerate(siblings[:6]):  # 상위 6개 캐릭터
+            # 상위 6개 캐릭터를 최대 EXPEDITION_CONCURRENCY개씩 동시에 조회 (분당 요청 예산은 API 클라이언트의 rate limiter가 관리)
+            semaphore = asyncio.Semaphore(EXPEDITION_CONCURRENCY)
+            top_characters = siblings[:6]  # 상위 6개 캐릭터
+            details = await asyncio.gather(*[
+                self._fetch_character_details(character.get("CharacterName", "알 수 없음"), semaphore)
+                for character in top_characters
+            ])
+
+            embeds = []
+            for idx, (character, armory) in enumerate(zip(top_characters, details)):
                 character_name = character.get("CharacterName", "알 수 없음")
                 item_level = character.get("ItemMaxLevel", "알 수 없음")
                 character_class = character.get("CharacterClassName", "알 수 없음")
 
-                # 보석 데이터 가져오기
-                gems_data = await fetch_character_gems(character_name)
-                gems = parse_gem_info(gems_data.get("Gems", [])) if gems_data else {}
+                armory = armory or {}
+
+                # 보석 데이터
+                gems = parse_gem_info(armory)
                 gems_description = " / ".join(
                     [f"{gem} {count}개" for gem, count in gems.items()]
                 ) if gems else "보석 정보 없음"
 
-                # 카드 데이터 가져오기
-                cards_data = await fetch_character_cards(character_name)
-                card_info = parse_card_info(cards_data)
+                # 카드 데이터
+                card_info = parse_card_info(armory)
 
-                # 프로필 데이터 가져오기
-                profile = await fetch_character_profile(character_name)
+                # 프로필 데이터
+                profile = armory.get("ArmoryProfile")
                 if profile is None:
                     character_image = None
                 else:
@@ -139,8 +219,10 @@ class CharacterCog(commands.Cog):
                 if character_image:
                     embed.set_thumbnail(url=character_image)
 
-                # 각 캐릭터별 임베드 전송
-                await ctx.send(embed=embed, delete_after=300)
+                embeds.append(embed)
+
+            # 모든 캐릭터 임베드를 한 메시지로 전송 (메시지당 최대 10개)
+            await ctx.send(embeds=embeds, delete_after=300)
 
         except Exception as e:
             # 오류 발생 시
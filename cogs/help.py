@@ -68,9 +68,11 @@ class HelpCog(commands.Cog):
             {"name": "!일정", "description": "길드의 노션 캘린더에 등록된 레이드 일정을 디스코드에서 확인할 수 있습니다."},
             {"name": "!레이드 [날짜] [시] [분] [보스] [난이도] [숙련도]", "description": "새로운 레이드 일정을 등록합니다. \n예시) !레이드 2023-12-01 18:00 발탄 하드 숙련"},
             {"name": "!보석 [레벨] [보석종류]", "description": "입력한 보석의 레벨과 종류에 따라 경매장에서 해당 보석의 최저가를 검색합니다."},
-            {"name": "!유각 [각인명]", "description": "입력한 각인명을 기준으로 경매장에서 해당 각인의 가격을 검색합니다."},
+            {"name": "!보석시세", "description": "1~10레벨 겁화/작열/멸화/홍염 보석의 최저가를 한 번에 표로 보여줍니다."},
+            {"name": "!유각 [각인명]", "description": "입력한 각인명을 기준으로 경매장에서 해당 각인의 가격을 검색합니다. 쉼표로 구분해 여러 각인을 한 번에 검색할 수 있습니다."},
             {"name": "!유각시세", "description": "현재 경매장에서 가장 비싼 유각(각인서) 시세 상위 10개를 보여줍니다."},
             {"name": "!강화재료", "description": "현재 경매장에서 강화재료의 가장 싼 시세를 보여줍니다."},
+            {"name": "!시세추이 [레벨] [보석종류] [일수] / [각인명] [일수]", "description": "보석 또는 각인서의 최근 N일(기본 7일) 최저/평균/최고 시세를 보여줍니다. \n예시) !시세추이 10 겁화 7"},
             {"name": "!악세", "description": "악세서리와 옵션, 품질을 선택하여 경매장에서 검색합니다."},
             {"name": "!투표채널생성 [채널명]", "description": "새로운 투표 채널을 생성합니다."},
             {"name": "!투표설정 [유형] [제목] [시간] [인원] [선택지1] [선택지2]...", "description": "새로운 투표를 설정합니다. \n예시) !투표설정 일반 \"최고의 게임\" \"2023-12-03 18:00\" 전체 \"롤\" \"오버워치\" \"발로란트\""},
@@ -80,6 +82,7 @@ class HelpCog(commands.Cog):
             {"name": "!투표결과", "description": "현재 투표의 결과를 확인합니다."},
             {"name": "!투표초기화", "description": "현재 채널의 투표 데이터를 초기화합니다."},
             {"name": "!리소스체크", "description": "서버의 CPU 및 메모리 사용률을 확인합니다."},
+            {"name": "!api상태", "description": "로스트아크 API 키별 요청 대기열과 대기 시간을 확인합니다. (관리자 전용)"},
             {"name": "!공략", "description": "레이드 공략 메뉴를 보여줍니다."},
             {"name": "!레이드추가 [레이드종류] [보스 이름] [링크]", "description": "새로운 레이드 공략 정보를 추가합니다."},
             {"name": "!레이드수정 [레이드종류] [보스 이름] [새로운 링크]", "description": "기존 레이드 공략 정보를 수정합니다."},
@@ -3,6 +3,8 @@ from nextcord.ext import commands, tasks
 from nextcord import ui, Interaction
 from nextcord import Color
 from utils.music_db import Database
+from services.youtube import TrackResolver, should_preresolve
+from services.lyrics import LyricsTimeline
 import yt_dlp
 import asyncio
 from datetime import timedelta
@@ -22,13 +24,15 @@ class SubMusicState:
         self.message_lyrics = None
         self.message_time = None
         self.previous_messages = []
-        self.current_lyrics = []
+        self.current_lyrics = LyricsTimeline()
+        self.lyric_cursor = 0  # 현재 가사 줄 위치
         self.leave_task = None
         self._is_playing_next = False
         self._queue_empty_message_sent = False
         self.text_channel = None
         self.paused_time = None  # 일시정지 시점
         self.paused_duration = 0  # 총 일시정지 시간
+        self.preresolve_task = None  # 다음 곡 미리 추출 태스크
 
 class SubMusicView(ui.View):
     def __init__(self, music_cog):
@@ -165,6 +169,7 @@ class SubMusicCog(commands.Cog):
         self.database = database
         self.guild_states = {}
         self.guild_tasks = {}  # 서버별 태스크 관리 딕셔너리
+        self.resolver = TrackResolver(database)  # 곡마다 yt_dlp 추출은 한 번만, 곡 정보는 DB에 캐시
 
     def get_all_states(self):
         """서버별 현재 상태 반환"""
@@ -297,27 +302,23 @@ class SubMusicCog(commands.Cog):
                 return
 
             # YouTube URL에서 오디오 스트림 가져오기
-            ydl_opts = {
-                "format": "bestaudio/best",
-                "quiet": True,
-                "postprocessors": [{"key": "FFmpegExtractAudio", "preferredcodec": "mp3", "preferredquality": "192"}],
-            }
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                audio_url = info.get("url")
-                title = info.get("title", "알 수 없는 제목")
-                thumbnail = info.get("thumbnail", None)
-                duration = info.get("duration", 0)
+            track = await self.resolver.resolve(url)
+            audio_url = track["audio_url"]
+            title = track["title"]
+            thumbnail = track["thumbnail"]
+            duration = track["duration"]
 
-                state.total_duration = duration
-                state.current_song = {"title": title, "url": url, "thumbnail": thumbnail, "duration": str(timedelta(seconds=duration)), "requester": requester}
+            state.total_duration = duration
+            state.current_song = {"title": title, "url": url, "thumbnail": thumbnail, "duration": str(timedelta(seconds=duration)), "requester": requester}
 
-                # 가사 가져오기 로그 추가
-                print("🔍 가사 데이터를 가져오는 중...")
-                state.current_lyrics = await self.fetch_lyrics(url)
+            # 가사 가져오기 로그 추가
+            print("🔍 가사 데이터를 가져오는 중...")
+            state.current_lyrics = await self.fetch_lyrics(track)
 
             # 재생 시작 시간 설정
             state.start_time = asyncio.get_event_loop().time()  # 현재 시간을 설정
+            state.preresolve_task = None
+            state.lyric_cursor = 0
 
             # 곡 재생
             def after_play(error):
@@ -380,45 +381,36 @@ class SubMusicCog(commands.Cog):
             return True
         return False
 
-    async def fetch_lyrics(self, url):
-        """유튜브 자막 데이터 가져오기"""
-        ydl_opts = {
-            "writesubtitles": True,
-            "writeautomaticsub": True,
-            "subtitleslangs": ["en", "ko"],
-            "quiet": True,
-            "skip_download": True,
-        }
-
+    async def fetch_lyrics(self, track):
+        """유튜브 자막 데이터 가져오기 (트랙 정보의 자막 URL 사용)"""
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                print(f"🔍 {url}에서 YouTube 정보 가져오는 중...")
-                info = ydl.extract_info(url, download=False)
-                subtitles = info.get("subtitles") or info.get("automatic_captions")
-
-                if not subtitles:
-                    print("⚠️ 자막 데이터가 없습니다.")
-                    return []
-
-                for lang in ["ko", "en"]:  # 우선순위: 한국어 > 영어
-                    if lang in subtitles:
-                        subtitle_url = subtitles[lang][0]["url"]
-
-                        async with aiohttp.ClientSession() as session:
-                            async with session.get(subtitle_url) as response:
-                                if response.status != 200:
-                                    print(f"⚠️ 자막 요청 실패: HTTP {response.status}")
-                                    continue
-                                raw_subtitles = await response.text()
-                                parsed_lyrics = self.parse_lyrics(raw_subtitles)
-                                if parsed_lyrics:
-                                    return parsed_lyrics
-                                else:
-                                    print(f"⚠️ {lang} 자막 파싱 실패.")
-                return []
+            subtitles = track["captions"]
+            if not subtitles:
+                print("⚠️ 자막 데이터가 없습니다.")
+                return LyricsTimeline()
+
+            for lang, subtitle_url in subtitles.items():  # 우선순위: 한국어 > 영어
+                # 파싱해 둔 가사가 DB에 있으면 재사용
+                record = await self.database.get_lyrics(track["video_id"], lang)
+                if record:
+                    return LyricsTimeline.from_record(*record)
+
+                async with aiohttp.ClientSession() as session:
+                    async with session.get(subtitle_url) as response:
+                        if response.status != 200:
+                            print(f"⚠️ 자막 요청 실패: HTTP {response.status}")
+                            continue
+                        raw_subtitles = await response.text()
+                parsed_lyrics = self.parse_lyrics(raw_subtitles)
+                if parsed_lyrics:
+                    await self.database.save_lyrics(track["video_id"], lang, *parsed_lyrics.to_record())
+                    return parsed_lyrics
+                else:
+                    print(f"⚠️ {lang} 자막 파싱 실패.")
+            return LyricsTimeline()
         except Exception as e:
             print(f"❌ 자막 데이터 가져오기 실패: {e}")
-            return []
+            return LyricsTimeline()
 
     def parse_lyrics(self, raw_subtitles):
         """유튜브 자막 데이터를 JSON 형식에서 파싱"""
@@ -428,9 +420,9 @@ class SubMusicCog(commands.Cog):
             events = subtitles_json.get("events", [])
             if not events:
                 print("⚠️ 자막 이벤트가 비어 있습니다.")
-                return []
+                return LyricsTimeline()
 
-            lyrics = []
+            starts, ends, texts = [], [], []
             for event in events:
                 start_time = event.get("tStartMs", 0) / 1000  # 밀리초를 초로 변환
                 duration = event.get("dDurationMs", 0) / 1000  # 밀리초를 초로 변환
@@ -441,30 +433,26 @@ class SubMusicCog(commands.Cog):
 
                 # 데이터 추가
                 if text.strip():
-                    lyrics.append({
-                        "start": start_time,
-                        "end": start_time + duration,
-                        "text": text.strip()
-                    })
-            return lyrics
+                    starts.append(start_time)
+                    ends.append(start_time + duration)
+                    texts.append(text.strip())
+            return LyricsTimeline(starts, ends, texts)
         except json.JSONDecodeError as e:
             print(f"⚠️ JSON 파싱 실패: {e}")
-            return []
+            return LyricsTimeline()
 
     async def _get_song_info(self, url):
         """URL에서 곡 정보를 추출"""
-        ydl_opts = {"quiet": True}
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            try:
-                info = ydl.extract_info(url, download=False)
-                return {
-                    "title": info.get("title", "알 수 없는 제목"),
-                    "duration": str(timedelta(seconds=info.get("duration", 0))),
-                    "requester": "알 수 없음",  # 요청자 정보를 저장하지 않는 경우 기본값
-                }
-            except Exception as e:
-                print(f"곡 정보 추출 실패: {e}")
-                return {"title": "정보 없음", "duration": "알 수 없음", "requester": "알 수 없음"}
+        try:
+            meta = await self.resolver.get_metadata(url)
+            return {
+                "title": meta["title"],
+                "duration": str(timedelta(seconds=meta["duration"])),
+                "requester": "알 수 없음",  # 요청자 정보를 저장하지 않는 경우 기본값
+            }
+        except Exception as e:
+            print(f"곡 정보 추출 실패: {e}")
+            return {"title": "정보 없음", "duration": "알 수 없음", "requester": "알 수 없음"}
 
     async def add_to_queue(self, guild_id, url, requester):
         """대기열에 곡 추가 (최대 20개 제한)"""
@@ -473,11 +461,8 @@ class SubMusicCog(commands.Cog):
             return False, queue_count, None  # 대기열이 가득 찬 경우
     
         # URL에서 제목 추출
-        ydl_opts = {"quiet": True}
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                title = info.get("title", "알 수 없는 제목")
+            title = (await self.resolver.get_metadata(url))["title"]
         except Exception as e:
             print(f"곡 정보 추출 실패: {e}")
             title = "알 수 없는 제목"
@@ -536,19 +521,17 @@ class SubMusicCog(commands.Cog):
                 return
 
         # URL 유효성 확인 및 곡 정보 가져오기
-        ydl_opts = {"quiet": True}
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            try:
-                info = ydl.extract_info(url, download=False)
-            except yt_dlp.utils.DownloadError:
-                await ctx.send("❌ 유효하지 않은 URL입니다! 다시 입력해주세요~ 😅", delete_after=10)
-                return
-            except Exception as e:
-                print(f"유튜브 정보 가져오기 실패: {e}")
-                await ctx.send("⚠️ 유튜브에서 정보를 가져오는 데 실패했습니다! 인터넷 연결을 확인해주세요~ 🌐", delete_after=10)
-                return
+        try:
+            meta = await self.resolver.get_metadata(url)
+        except yt_dlp.utils.DownloadError:
+            await ctx.send("❌ 유효하지 않은 URL입니다! 다시 입력해주세요~ 😅", delete_after=10)
+            return
+        except Exception as e:
+            print(f"유튜브 정보 가져오기 실패: {e}")
+            await ctx.send("⚠️ 유튜브에서 정보를 가져오는 데 실패했습니다! 인터넷 연결을 확인해주세요~ 🌐", delete_after=10)
+            return
 
-        title = info.get("title", "알 수 없는 제목")
+        title = meta["title"]
 
         # 현재 곡 재생 여부 확인
         if state.voice_client.is_playing() or state.is_paused:
@@ -586,36 +569,29 @@ class SubMusicCog(commands.Cog):
             # 이전 메시지 삭제
             await self._delete_previous_messages(guild_id)
 
-            # YouTube 데이터 가져오기
-            ydl_opts = {
-                "format": "bestaudio/best",
-                "quiet": True,
-                "postprocessors": [
-                    {"key": "FFmpegExtractAudio", "preferredcodec": "mp3", "preferredquality": "192"}
-                ],
-            }
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                try:
-                    info = ydl.extract_info(url, download=False)
-                    audio_url = info.get("url")
-                    if not audio_url:
-                        raise ValueError("오디오 URL을 가져오지 못했습니다.")
-
-                    title = info.get("title", "알 수 없는 제목")
-                    thumbnail = info.get("thumbnail", None)
-                    duration = info.get("duration", 0)
-                    state.total_duration = duration
-
-                    print(f"🎶 재생 준비 완료: {title}")
-
-                    # 자막 가져오기
-                    state.current_lyrics = await self.fetch_lyrics(url)
-                    if not state.current_lyrics:
-                        print("⚠️ 가사 데이터를 가져오지 못했습니다.")
-                except Exception as e:
-                    print(f"음악 재생 중 오류: {e}")
-                    await self._send_error_message(text_channel, "음악 재생 중 오류가 발생했습니다!")
-                    return
+            # YouTube 데이터 가져오기 (대기열 추가 때 추출한 정보가 있으면 재사용)
+            try:
+                track = await self.resolver.resolve(url)
+                audio_url = track["audio_url"]
+                if not audio_url:
+                    self.resolver.invalidate(url)
+                    raise ValueError("오디오 URL을 가져오지 못했습니다.")
+
+                title = track["title"]
+                thumbnail = track["thumbnail"]
+                duration = track["duration"]
+                state.total_duration = duration
+
+                print(f"🎶 재생 준비 완료: {title}")
+
+                # 자막 가져오기
+                state.current_lyrics = await self.fetch_lyrics(track)
+                if not state.current_lyrics:
+                    print("⚠️ 가사 데이터를 가져오지 못했습니다.")
+            except Exception as e:
+                print(f"음악 재생 중 오류: {e}")
+                await self._send_error_message(text_channel, "음악 재생 중 오류가 발생했습니다!")
+                return
 
             # 현재 재생 곡 정보 업데이트
             state.current_song = {
@@ -625,6 +601,8 @@ class SubMusicCog(commands.Cog):
                 "duration": str(timedelta(seconds=duration)),
             }
             state.start_time = asyncio.get_event_loop().time()
+            state.preresolve_task = None
+            state.lyric_cursor = 0
 
             # ffmpeg을 통해 오디오 재생
             ffmpeg_options = {"before_options": "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5", "options": "-vn"}
@@ -914,6 +892,17 @@ class SubMusicCog(commands.Cog):
         """
         return await self.database.get_queue(guild_id)  # self.database를 통해 대기열 정보 가져오기
 
+    async def _preresolve_next(self, guild_id):
+        """대기열의 다음 곡을 미리 추출해 두기 (곡이 바뀔 때 추출 대기 시간 제거)"""
+        try:
+            next_song = await self.database.peek_next_song(guild_id)
+            if next_song:
+                track = await self.resolver.resolve(next_song["url"])
+                await self.fetch_lyrics(track)  # 가사도 미리 받아 DB에 저장
+                print(f"✅ 다음 곡 미리 준비 완료: {next_song['title']}")
+        except Exception as e:
+            print(f"⚠️ 다음 곡 미리 준비 중 오류 발생: {e}")
+
     async def update_play_time(self, guild_id):
         """재생 시간 업데이트"""
         state = self.get_state(guild_id)
@@ -931,6 +920,10 @@ class SubMusicCog(commands.Cog):
                 elapsed_formatted = str(timedelta(seconds=elapsed_seconds))
                 total_duration_formatted = str(timedelta(seconds=state.total_duration))
 
+                # 곡 후반부에 들어서면 다음 곡을 미리 추출
+                if state.preresolve_task is None and should_preresolve(elapsed_seconds, state.total_duration):
+                    state.preresolve_task = asyncio.create_task(self._preresolve_next(guild_id))
+
                 # 임베드 생성
                 embed_time = nextcord.Embed(color=Color.from_rgb(255, 182, 193))
                 if state.current_song.get("thumbnail"):
@@ -977,10 +970,8 @@ class SubMusicCog(commands.Cog):
                     await asyncio.sleep(1)
                     continue
                 
-                current_lyric = next(
-                    (lyric["text"] for lyric in state.current_lyrics if lyric["start"] <= current_time <= lyric["end"]),
-                    "현재 표시할 가사가 없습니다."
-                )
+                current_lyric, state.lyric_cursor = state.current_lyrics.lookup(current_time, state.lyric_cursor)
+                current_lyric = current_lyric or "현재 표시할 가사가 없습니다."
     
                 embed_lyrics = nextcord.Embed(
                     title="🎵현재 재생 중",
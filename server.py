@@ -3,6 +3,7 @@ from utils.json_loader import load_json
 from utils.music_db import Database
 from nextcord.ext import commands
 from cogs.sub_music import SubMusicCog
+from services import youtube
 import asyncio
 import threading
 import nextcord
@@ -15,11 +16,16 @@ CONFIG_PATH = os.path.join(BASE_DIR, "../config/settings.json")
 config = load_json(CONFIG_PATH)
 
 # 서브봇 정의 및 초기화
+class SubBot(commands.Bot):
+    async def close(self):
+        youtube.shutdown()  # 대기 중인 yt_dlp 추출 작업 취소
+        await super().close()
+
 intents = nextcord.Intents.default()
 intents.messages = True
 intents.guilds = True
 intents.message_content = True  # 추가: 메시지 내용 접근 권한
-subbot = commands.Bot(command_prefix="?", intents=intents)
+subbot = SubBot(command_prefix="?", intents=intents)
 
 # SQLite 초기화
 database = Database("subbot_music_queue.db")
@@ -90,6 +96,7 @@ def run_flask():
 # 안전한 종료 처리
 def shutdown_handler(signal, frame):
     print("🛑 서버 종료 중...")
+    youtube.shutdown()  # os._exit 전에 대기 중인 yt_dlp 추출 작업 취소
     subbot.close()
     database.close()  # 데이터베이스 연결 해제
     os._exit(0)
@@ -0,0 +1,109 @@
+import time
+
+# 옵션 그룹명과 경매장 응답의 OptionName이 다른 경우만 등록 (나머지는 공백을 뺀 이름으로 비교)
+OPTION_NAME_ALIASES = {
+    "서폿 아덴 획득량": "세레나데, 신앙, 조화 게이지 획득량",
+}
+
+
+def option_key(option_name, is_percentage):
+    """경매장 응답 옵션 -> (공백 뺀 이름, 퍼센트 여부)"""
+    return option_name.replace(" ", ""), bool(is_percentage)
+
+
+def group_key(group):
+    """옵션 그룹명("공격력 +", "무기공격력 %") -> (공백 뺀 이름, 퍼센트 여부), 퍼센트 구분이 없으면 None"""
+    name = OPTION_NAME_ALIASES.get(group, group)
+    if name.endswith(" +"):
+        return name[:-2].replace(" ", ""), False
+    if name.endswith(" %"):
+        return name[:-2].replace(" ", ""), True
+    return name.replace(" ", ""), None
+
+
+def option_predicate(option):
+    """
+    검색 옵션(AccessoryOption) 조건 함수.
+    API 검색과 같은 결과를 보장할 수 있는 옵션(MinValue/MaxValue 범위 없이 옵션 유무만 보는 옵션)만 처리하고,
+    범위가 있는 옵션은 API의 범위 값과 매물 수치의 대응을 알 수 없으므로 None (API로 검색)
+    """
+    if option.min_value or option.max_value:
+        return None
+    name, is_percentage = group_key(option.group)
+
+    def predicate(options):
+        return any(
+            option_name.startswith(name) and (is_percentage is None or percentage == is_percentage)
+            for option_name, percentage in options
+        )
+
+    return predicate
+
+
+class AccessorySnapshot:
+    """
+    악세서리 경매장 스냅샷 (카테고리별로 열 단위 저장).
+    주기적으로 카테고리 매물을 즉시 구매가 순으로 모아 두고, 검색 조건은 API 호출 없이 로컬에서 필터링합니다.
+    """
+
+    def __init__(self, max_age):
+        self.max_age = max_age  # 이보다 오래된 스냅샷은 사용하지 않음 (초)
+        self._categories = {}  # category_code -> (열 dict, 갱신 시각, 전체 매물 수집 여부)
+
+    def replace(self, category_code, items, complete=True, updated_at=None):
+        """
+        카테고리 스냅샷을 새 매물 목록으로 교체.
+        complete가 False면 최저가 일부만 모은 스냅샷 (그보다 비싼 매물은 없는 것으로 볼 수 없음)
+        """
+        columns = {"grade": [], "quality": [], "options": [], "item": []}
+        for item in items:
+            columns["grade"].append(item.get("Grade"))
+            columns["quality"].append(item.get("GradeQuality") or 0)
+            columns["options"].append({
+                option_key(option["OptionName"], option.get("IsValuePercentage")): option["Value"]
+                for option in item.get("Options") or []
+                if option.get("Type") == "ACCESSORY_UPGRADE"
+            })
+            columns["item"].append(item)
+        self._categories[category_code] = (columns, time.time() if updated_at is None else updated_at, complete)
+
+    def search(self, category_code, item_grade, min_quality, options, page_no, page_size=10):
+        """
+        조건에 맞는 매물을 API 응답과 같은 형태로 반환합니다.
+        options는 [AccessoryOption], 스냅샷이 없거나 오래되었거나 판정할 수 없는 옵션이 있으면 None.
+        최저가 일부만 모은 스냅샷은 요청한 페이지를 가득 채울 때만 사용하고 (이때 TotalCount는 하한), 아니면 None
+        """
+        entry = self._categories.get(category_code)
+        if entry is None or time.time() - entry[1] > self.max_age:
+            return None
+
+        predicates = [option_predicate(option) for option in options]
+        if None in predicates:
+            return None
+
+        columns = entry[0]
+        grades, qualities, row_options = columns["grade"], columns["quality"], columns["options"]
+        matches = [
+            index for index in range(len(grades))
+            if (not item_grade or grades[index] == item_grade)
+            and qualities[index] >= min_quality
+            and all(predicate(row_options[index]) for predicate in predicates)
+        ]
+
+        start = (page_no - 1) * page_size
+        if not entry[2] and len(matches) < start + page_size:
+            return None  # 수집하지 못한 더 비싼 매물 중에 조건에 맞는 것이 있을 수 있음
+        return {
+            "PageNo": page_no,
+            "PageSize": page_size,
+            "TotalCount": len(matches),
+            "Items": [columns["item"][index] for index in matches[start:start + page_size]],
+        }
+
+    def stats(self):
+        """카테고리별 (매물 수, 경과 시간)"""
+        now = time.time()
+        return {
+            category_code: (len(columns["item"]), now - updated_at)
+            for category_code, (columns, updated_at, _) in self._categories.items()
+        }
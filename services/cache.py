@@ -0,0 +1,134 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 호출을 하나의 업스트림 호출로 합칩니다 (single-flight).
+    먼저 온 호출의 결과(파싱된 응답 객체)를 나머지 호출자와 공유하므로, 호출자는 결과를 수정하면 안 됩니다.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._inflight = {}  # key -> 진행 중인 Task
+
+        # 통계
+        self.shared = 0  # 진행 중인 호출에 합류한 횟수
+
+    def start(self, key, fn):
+        """진행 중인 호출이 있으면 그 Task를, 없으면 fn()을 새로 시작한 Task를 반환"""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.shared += 1
+            return task
+
+        task = asyncio.ensure_future(fn())
+        task.add_done_callback(lambda done, key=key: self._finish(key, done))
+        self._inflight[key] = task
+        return task
+
+    def _finish(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 실패는 로그로 남김 (기다리는 호출자는 예외를 그대로 받음)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"⚠️ [{self.name}] 요청 실패: {task.exception()}")
+
+
+class AsyncTTLCache:
+    """
+    비동기 TTL 캐시 (LRU 크기 제한).
+    - 같은 키를 동시에 요청하면 업스트림 호출은 한 번만 수행 (request coalescing)
+    - TTL이 지났어도 stale_ttl 이내면 이전 값을 바로 반환하고 백그라운드에서 갱신 (stale-while-revalidate)
+    - store(DiskCache)를 지정하면 새로 가져온 값을 디스크에도 저장하고, warm()으로 재시작 후 복원
+    """
+
+    def __init__(self, name, ttl, stale_ttl=0, maxsize=512, store=None):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.maxsize = maxsize
+        self.store = store
+        self._entries = OrderedDict()  # key -> (value, fetched_at)
+        self._flight = SingleFlight(name)  # 같은 키의 동시 로드를 하나로 합침
+
+        # 통계
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    async def get(self, key, loader):
+        """캐시된 값을 반환하고, 없으면 loader()를 호출해 채움"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, fetched_at = entry
+            age = time.monotonic() - fetched_at
+            if age < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._load(key, loader)  # 백그라운드 갱신
+                return value
+
+        self.misses += 1
+        return await asyncio.shield(self._load(key, loader))
+
+    def _load(self, key, loader):
+        """진행 중인 로드가 있으면 재사용하고, 없으면 새로 시작"""
+        return self._flight.start(key, lambda: self._run(key, loader))
+
+    async def _run(self, key, loader):
+        value = await loader()
+        if value is not None:  # 실패(None)는 캐시하지 않음
+            self.set(key, value)
+            self._persist(key, value)
+        return value
+
+    def _persist(self, key, value):
+        """디스크 캐시에 백그라운드로 저장 (실패해도 응답에는 영향 없음)"""
+        if self.store is None:
+            return
+        try:
+            self.store.set_later(self.name, key, value, self.ttl + self.stale_ttl)
+        except Exception as e:
+            print(f"⚠️ [{self.name}] 디스크 캐시 저장 실패: {e}")
+
+    def warm(self):
+        """디스크 캐시에 남아 있는 값으로 메모리 캐시를 채우고, 채운 개수를 반환"""
+        if self.store is None:
+            return 0
+        entries = self.store.load(self.name)
+        # 디스크에는 벽시계 시각이 저장되어 있으므로 monotonic 기준으로 변환
+        offset = time.monotonic() - time.time()
+        for key, value, fetched_at in entries[-self.maxsize:]:
+            self.set(key, value, fetched_at=fetched_at + offset)
+        return min(len(entries), self.maxsize)
+
+    def set(self, key, value, fetched_at=None):
+        self._entries[key] = (value, time.monotonic() if fetched_at is None else fetched_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key=None):
+        """특정 키 또는 전체 캐시 삭제"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self):
+        total = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self._flight.shared,
+            "hit_rate": (self.hits + self.stale_hits) / total * 100 if total else 0.0,
+        }
@@ -0,0 +1,127 @@
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class DiskCache:
+    """
+    SQLite 기반 로스트아크 API 응답 캐시.
+    봇을 재시작해도 응답을 유지하고, 부팅 시 메모리 캐시를 미리 채우는 데 사용합니다.
+    봇 실행 중의 저장은 set_later()로 전용 스레드 하나에서 순서대로 처리해 이벤트 루프를 막지 않습니다.
+    """
+
+    def __init__(self, db_path="lostark_cache.db", max_entries=5000, evict_every=100):
+        self.max_entries = max_entries
+        self.evict_every = evict_every  # N번 저장할 때마다 정리
+        self._writes = 0
+        self.db_path = db_path
+        self.conn = None
+        self.cursor = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="disk-cache")
+
+    def open(self):
+        """처음 사용할 때 연결 (모듈 import만으로는 DB 파일을 만들지 않음)"""
+        if self.conn is None:
+            # 저장은 전용 스레드에서, 부팅 시 복원과 종료는 메인 스레드에서 하므로 스레드 검사 끔 (동시에 쓰지는 않음)
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.cursor = self.conn.cursor()
+            self.create_tables()
+
+    def create_tables(self):
+        """테이블 생성"""
+        self.cursor.execute("PRAGMA journal_mode=WAL")
+        self.cursor.execute("PRAGMA synchronous=NORMAL")
+        self.cursor.execute("""
+        CREATE TABLE IF NOT EXISTS api_cache (
+            namespace TEXT NOT NULL,
+            cache_key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (namespace, cache_key)
+        )
+        """)
+        self.cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_api_cache_expires ON api_cache (expires_at)
+        """)
+        self.cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_api_cache_fetched ON api_cache (fetched_at)
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def encode_key(key):
+        return json.dumps(key, ensure_ascii=False, sort_keys=True)
+
+    @staticmethod
+    def decode_key(cache_key):
+        key = json.loads(cache_key)
+        return tuple(key) if isinstance(key, list) else key
+
+    def set(self, namespace, key, value, ttl, fetched_at=None):
+        """응답 저장 (ttl초 후 만료)"""
+        self.open()
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        self.cursor.execute("""
+        INSERT OR REPLACE INTO api_cache (namespace, cache_key, value, fetched_at, expires_at)
+        VALUES (?, ?, ?, ?, ?)
+        """, (namespace, self.encode_key(key), json.dumps(value, ensure_ascii=False), fetched_at, fetched_at + ttl))
+        self.conn.commit()
+
+        self._writes += 1
+        if self._writes % self.evict_every == 0:
+            self.evict()
+
+    def set_later(self, namespace, key, value, ttl):
+        """set()을 전용 스레드에서 실행 (실패는 로그로만 남김)"""
+        future = self._executor.submit(self.set, namespace, key, value, ttl, time.time())
+        future.add_done_callback(self._log_failure)
+
+    @staticmethod
+    def _log_failure(future):
+        if future.exception() is not None:
+            print(f"⚠️ 디스크 캐시 저장 실패: {future.exception()}")
+
+    def get(self, namespace, key):
+        """만료되지 않은 응답 반환, 없으면 None"""
+        self.open()
+        self.cursor.execute("""
+        SELECT value FROM api_cache
+        WHERE namespace = ? AND cache_key = ? AND expires_at > ?
+        """, (namespace, self.encode_key(key), time.time()))
+        row = self.cursor.fetchone()
+        return json.loads(row[0]) if row else None
+
+    def load(self, namespace):
+        """만료되지 않은 응답 전체를 [(key, value, fetched_at)] 형태로 반환 (오래된 순)"""
+        self.open()
+        self.cursor.execute("""
+        SELECT cache_key, value, fetched_at FROM api_cache
+        WHERE namespace = ? AND expires_at > ?
+        ORDER BY fetched_at
+        """, (namespace, time.time()))
+        return [(self.decode_key(row[0]), json.loads(row[1]), row[2]) for row in self.cursor.fetchall()]
+
+    def evict(self):
+        """만료된 응답 삭제 후, 최대 개수를 넘으면 오래된 순으로 삭제"""
+        self.open()
+        self.cursor.execute("DELETE FROM api_cache WHERE expires_at <= ?", (time.time(),))
+        self.cursor.execute("""
+        DELETE FROM api_cache WHERE rowid IN (
+            SELECT rowid FROM api_cache
+            ORDER BY fetched_at DESC
+            LIMIT -1 OFFSET ?
+        )
+        """, (self.max_entries,))
+        self.conn.commit()
+
+    def close(self):
+        """남은 저장 작업을 마친 뒤 데이터베이스 연결 닫기 (한 번도 사용하지 않았으면 아무것도 하지 않음)"""
+        self._executor.shutdown(wait=True)
+        if self.conn is None:
+            return
+        self.evict()
+        self.conn.close()
+        self.conn = None
+        self.cursor = None
@@ -0,0 +1,84 @@
+import time
+
+
+class ApiKeyState:
+    """API 키 하나의 사용 현황"""
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+        self.requests = 0
+        self.last_limited_at = 0.0  # 마지막으로 401/429를 받은 시각
+        self.failures = 0  # 연속 401/429 횟수
+        self.quarantined_until = 0.0
+
+    @property
+    def is_quarantined(self):
+        return time.monotonic() < self.quarantined_until
+
+
+class ApiKeyPool:
+    """
+    여러 로스트아크 API 키에 요청을 분산합니다.
+    가장 오래전에 제한을 받은 키부터 사용하고, 401/429가 연속되면 일정 시간 격리합니다.
+    """
+
+    def __init__(self, api_keys, max_failures=3, quarantine_seconds=60, unauthorized_quarantine_seconds=3600):
+        api_keys = [api_key for api_key in dict.fromkeys(api_keys) if api_key]
+        if not api_keys:
+            print("⚠️ 로스트아크 API 키가 설정되지 않았습니다. (config/settings.json)")
+            api_keys = [""]
+        self.keys = [ApiKeyState(api_key) for api_key in api_keys]
+        self.max_failures = max_failures
+        self.quarantine_seconds = quarantine_seconds
+        self.unauthorized_quarantine_seconds = unauthorized_quarantine_seconds
+        self._by_key = {state.api_key: state for state in self.keys}
+
+    def select(self, rate_limiter=None):
+        """다음 요청에 사용할 키 선택"""
+        available = [state for state in self.keys if not state.is_quarantined]
+        if not available:
+            # 모든 키가 격리 중이면 가장 먼저 풀리는 키 사용
+            return min(self.keys, key=lambda state: state.quarantined_until).api_key
+
+        def priority(state):
+            # 제한을 받은 지 오래된 키 > 대기열이 짧은 키 > 남은 토큰이 많은 키
+            if rate_limiter is None:
+                return (state.last_limited_at, state.requests)
+            bucket = rate_limiter.bucket(state.api_key)
+            return (state.last_limited_at, bucket.waiting, -bucket.tokens)
+
+        return min(available, key=priority).api_key
+
+    def has_alternative(self, api_key):
+        """격리되지 않은 다른 키가 있는지 확인"""
+        return any(state.api_key != api_key and not state.is_quarantined for state in self.keys)
+
+    def report(self, api_key, status):
+        """응답 상태 코드를 기록하고 필요하면 키를 격리"""
+        state = self._by_key.get(api_key)
+        if state is None:
+            return  # 풀 밖의 키 (fetch_card_info 등)
+
+        state.requests += 1
+        if status not in (401, 429):
+            state.failures = 0
+            return
+
+        state.last_limited_at = time.monotonic()
+        state.failures += 1
+        if state.failures >= self.max_failures:
+            seconds = self.unauthorized_quarantine_seconds if status == 401 else self.quarantine_seconds
+            state.quarantined_until = time.monotonic() + seconds
+            state.failures = 0
+            print(f"⚠️ 로스트아크 API 키 ...{api_key[-4:]} {status} 응답 반복, {seconds}초 동안 격리합니다.")
+
+    def stats(self):
+        """키별 사용률 (전체 요청 중 비중)"""
+        total = sum(state.requests for state in self.keys) or 1
+        return {
+            state.api_key: {
+                "share": state.requests / total * 100,
+                "quarantined_for": max(0.0, state.quarantined_until - time.monotonic()),
+            }
+            for state in self.keys
+        }
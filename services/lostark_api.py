@@ -1,163 +1,429 @@
 import aiohttp
+import asyncio
 import os
 from utils.json_loader import load_json
-from bs4 import BeautifulSoup
+from services.rate_limiter import RateLimiter, backoff_delay, retry_after_seconds
+from services.key_pool import ApiKeyPool
+from services.cache import AsyncTTLCache
+from services.disk_cache import DiskCache
+import json
+from functools import lru_cache
+from typing import NamedTuple
+import html
 import re
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_PATH = os.path.join(BASE_DIR, "../../config/settings.json")
 config = load_json(CONFIG_PATH)
-LOSTARK_API_KEY = config["lostark"]["key"]
+# "keys" 목록을 우선 사용하고, 예전 설정("key" 하나)도 지원
+LOSTARK_API_KEYS = config["lostark"].get("keys") or [config["lostark"].get("key", "")]
 
-HEADERS = {"Authorization": f"Bearer {LOSTARK_API_KEY}"}
+BASE_URL = "https://developer-lostark.game.onstove.com"
+
+
+class GemListing(NamedTuple):
+    """경매장 보석 매물 (즉시 구매가가 있는 매물만)"""
+    name: str
+    buy_price: int
+    end_date: str
+
+
+class LostArkAPIError(Exception):
+    """로스트아크 API가 200 이외의 상태 코드를 반환했을 때 발생"""
+
+    def __init__(self, status, message):
+        super().__init__(f"{message}: {status}")
+        self.status = status
+
+
+class LostArkClient:
+    """
+    로스트아크 API 공용 클라이언트.
+    요청마다 세션을 새로 만들지 않고 keep-alive 커넥션 풀을 재사용하며,
+    여러 API 키에 요청을 분산하고, 키별 토큰 버킷으로 요청 예산을 지키며
+    401/429/5xx 응답은 재시도합니다.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, api_keys, limit=50, limit_per_host=20, dns_ttl=300, keepalive_timeout=60, timeout=10,
+                 rate=100, per=60.0, max_retries=3):
+        self.key_pool = ApiKeyPool(api_keys)
+        self.limit = limit  # 전체 동시 커넥션 수
+        self.limit_per_host = limit_per_host  # 호스트당 동시 커넥션 수
+        self.dns_ttl = dns_ttl  # DNS 캐시 유지 시간(초)
+        self.keepalive_timeout = keepalive_timeout  # 유휴 커넥션 유지 시간(초)
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.rate_limiter = RateLimiter(rate, per)  # 기본: 키당 분당 100회
+        self.max_retries = max_retries
+        self._session = None
+
+    def _get_session(self):
+        """세션이 없거나 닫혀 있으면 새로 생성 (이벤트 루프 안에서 호출)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    async def request(self, method, path, error_message="Failed to fetch data", api_key=None, **kwargs):
+        """
+        API 요청 후 JSON 응답 반환 (재시도 후에도 200이 아니면 LostArkAPIError).
+        api_key를 지정하지 않으면 키 풀에서 매 시도마다 키를 고릅니다.
+        """
+        session = self._get_session()
+
+        for attempt in range(self.max_retries + 1):
+            request_key = api_key or self.key_pool.select(self.rate_limiter)
+            bucket = self.rate_limiter.bucket(request_key)
+            headers = {"Authorization": f"Bearer {request_key}"}
+
+            await bucket.acquire()
+            async with session.request(method, f"{BASE_URL}{path}", headers=headers, **kwargs) as response:
+                bucket.update_from_headers(response.headers)
+                self.key_pool.report(request_key, response.status)
+                if response.status == 200:
+                    return await response.json()
+
+                # 401은 다른 키가 남아 있을 때만 재시도
+                retryable = response.status in self.RETRY_STATUSES or (
+                    response.status == 401 and api_key is None and self.key_pool.has_alternative(request_key)
+                )
+                if not retryable or attempt == self.max_retries:
+                    raise LostArkAPIError(response.status, error_message)
+
+                retry_after = retry_after_seconds(response.headers)
+                delay = 0.0 if response.status == 401 else backoff_delay(attempt)
+                if response.status == 429:
+                    bucket.throttled += 1
+                    if retry_after is not None:
+                        delay += retry_after
+                    bucket.block(delay)  # 같은 키를 쓰는 다른 요청도 함께 대기
+                    if api_key is None and self.key_pool.has_alternative(request_key):
+                        delay = 0.0  # 다른 키로 바로 재시도
+                print(f"⚠️ 로스트아크 API {response.status} 응답, {delay:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries})")
+
+            await asyncio.sleep(delay)
+
+    async def get(self, path, **kwargs):
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path, payload, **kwargs):
+        return await self.request("POST", path, json=payload, **kwargs)
+
+    def stats(self):
+        """API 키별 사용률, 격리 상태, 대기열 길이 및 대기 시간 통계"""
+        stats = {}
+        for api_key, pool_stats in self.key_pool.stats().items():
+            stats[api_key] = {**self.rate_limiter.bucket(api_key).stats(), **pool_stats}
+        return stats
+
+    async def close(self):
+        """커넥션 풀 정리 (봇 종료 시 호출)"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+# 모든 Cog가 공유하는 클라이언트
+client = LostArkClient(LOSTARK_API_KEYS)
+
+# 재시작 후에도 유지되는 응답 캐시 (settings.json의 cache.enabled로 사용 여부 설정, DB 파일은 처음 사용할 때 생성)
+CACHE_CONFIG = config.get("cache", {})
+disk_cache = DiskCache(
+    CACHE_CONFIG.get("file", "lostark_cache.db"),
+    max_entries=CACHE_CONFIG.get("max_entries", 5000)
+) if CACHE_CONFIG.get("enabled") else None
+
+# 응답 캐시 (TTL 초, TTL 이후에도 stale_ttl 동안은 이전 값을 주고 백그라운드 갱신)
+armory_cache = AsyncTTLCache("armories", ttl=300, stale_ttl=1800, maxsize=512, store=disk_cache)
+siblings_cache = AsyncTTLCache("siblings", ttl=600, stale_ttl=3600, maxsize=512, store=disk_cache)
+auction_cache = AsyncTTLCache("auctions", ttl=60, maxsize=256, store=disk_cache)
+market_cache = AsyncTTLCache("markets", ttl=60, maxsize=256, store=disk_cache)
+# 여러 페이지를 합친 카테고리 전체 조회 결과
+sweep_cache = AsyncTTLCache("sweeps", ttl=60, maxsize=16, store=disk_cache)
+# 악세서리 검색은 조건 조합이 많고 응답이 커서 짧게 메모리에만 보관 (여러 사용자의 같은 검색 공유)
+accessory_cache = AsyncTTLCache("accessories", ttl=30, maxsize=128)
+CACHES = [armory_cache, siblings_cache, auction_cache, market_cache, sweep_cache, accessory_cache]
+
+# 카테고리 전체 조회 시 동시에 요청할 페이지 수
+SWEEP_CONCURRENCY = 4
+
+def warm_caches():
+    """디스크 캐시로 메모리 캐시 채우기 (봇 시작 시 호출)"""
+    if disk_cache is None:
+        return
+    for cache in CACHES:
+        count = cache.warm()
+        if count:
+            print(f"✅ [{cache.name}] 디스크 캐시에서 {count}개 복원")
+
+async def shutdown():
+    """커넥션 풀과 디스크 캐시 정리 (봇 종료 시 호출)"""
+    await client.close()
+    if disk_cache is not None:
+        disk_cache.close()
+
+def normalize_payload(value):
+    """검색 조건의 문자열 공백 정리 ("10레벨  겁화 " -> "10레벨 겁화")"""
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {key: normalize_payload(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [normalize_payload(item) for item in value]
+    return value
+
+def payload_key(path, payload):
+    """POST 요청 캐시/single-flight 키 (경로 + 정렬된 payload)"""
+    return path, json.dumps(payload, ensure_ascii=False, sort_keys=True)
+
+async def post_market_query(cache, path, payload, error_message):
+    """
+    마켓/경매장 검색 요청.
+    payload를 정규화해 같은 조건의 동시 요청은 하나의 업스트림 요청과 파싱된 결과를 공유합니다.
+    """
+    payload = normalize_payload(payload)
+    return await cache.get(
+        payload_key(path, payload),
+        lambda: client.post(path, payload, error_message=error_message)
+    )
+
+# filters 이름 -> 통합 아머리 응답의 키
+ARMORY_SECTIONS = {
+    "profiles": "ArmoryProfile",
+    "gems": "ArmoryGem",
+    "cards": "ArmoryCard",
+}
+DEFAULT_ARMORY_FILTERS = ("profiles", "gems", "cards")
 
 async def fetch_character_siblings(character_name):
     """로스트아크 캐릭터 형제 정보 가져오기"""
-    url = f"https://developer-lostark.game.onstove.com/characters/{character_name}/siblings"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=HEADERS) as response:
-            response.raise_for_status()
-            return await response.json()
+    return await siblings_cache.get(
+        character_name.strip(),
+        lambda: client.get(f"/characters/{character_name}/siblings")
+    )
+
+async def fetch_character_armory(character_name, filters=DEFAULT_ARMORY_FILTERS):
+    """
+    통합 아머리 엔드포인트로 필요한 섹션(프로필/보석/카드 등)을 한 번에 가져오기.
+    캐릭터가 없으면 None을 반환합니다.
+    """
+    filter_query = "+".join(filters)
+    return await armory_cache.get(
+        (character_name.strip(), filter_query),
+        lambda: client.get(f"/armories/characters/{character_name}?filters={filter_query}")
+    )
 
 async def fetch_character_profile(character_name):
     """로스트아크 캐릭터 프로필 정보 가져오기"""
-    url = f"https://developer-lostark.game.onstove.com/armories/characters/{character_name}/profiles"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=HEADERS) as response:
-            response.raise_for_status()
-            return await response.json()
+    armory = await fetch_character_armory(character_name)
+    return armory.get(ARMORY_SECTIONS["profiles"]) if armory else None
         
 async def fetch_character_gems(character_name):
     """로스트아크 캐릭터 보석 정보 가져오기"""
-    url = f"https://developer-lostark.game.onstove.com/armories/characters/{character_name}/gems"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=HEADERS) as response:
-            response.raise_for_status()
-            return await response.json()
+    armory = await fetch_character_armory(character_name)
+    return armory.get(ARMORY_SECTIONS["gems"]) if armory else None
         
 async def fetch_character_cards(character_name: str):
     """로스트아크 캐릭터 카드 정보 가져오기"""
-    base_url = f"https://developer-lostark.game.onstove.com/armories/characters/{character_name}/cards"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(base_url, headers=HEADERS) as response:
-            if response.status == 200:
-                return await response.json()
-            else:
-                print(f"카드 정보 API 요청 실패: {response.status}")
-                return None
+    try:
+        armory = await fetch_character_armory(character_name)
+        return armory.get(ARMORY_SECTIONS["cards"]) if armory else None
+    except LostArkAPIError as e:
+        print(f"카드 정보 API 요청 실패: {e.status}")
+        return None
+
+# HTML 태그 제거용 정규식 (BeautifulSoup 대신 사용)
+TAG_PATTERN = re.compile(r"<[^>]*>")
+
+def strip_tags(name_html):
+    """HTML 태그 제거 후 엔티티(&amp; 등) 복원"""
+    text = TAG_PATTERN.sub("", name_html)
+    return html.unescape(text) if "&" in text else text
+
+@lru_cache(maxsize=1024)
+def parse_gem_name(name_html):
+    """보석 이름(HTML)을 (레벨, 종류)로 파싱 ("10레벨", "겁화"), 보석이 아니면 None"""
+    clean_name = strip_tags(name_html)
+
+    # "레벨"과 보석 종류 추출
+    if "레벨" not in clean_name:
+        return None
+    gem_level, gem_type = clean_name.split("레벨", 1)
+    gem_type = gem_type.split("의")[0].strip()  # 보석 종류 추출 ("멸화", "홍염" 등)
+    gem_level = gem_level.strip() + "레벨"  # 레벨 추가 ("7레벨", "8레벨" 등)
+    return gem_level, gem_type
 
 def parse_gem_info(gems):
-    """보석 정보 파싱"""
+    """보석 정보 파싱 (보석 목록 또는 통합 아머리 응답)"""
+    if isinstance(gems, dict):  # 통합 아머리 응답 또는 보석 섹션이면 보석 목록만 사용
+        gems = (gems.get(ARMORY_SECTIONS["gems"]) or gems).get("Gems")
+
     if not gems:  # gems가 None 또는 빈 리스트일 경우
         return {}
 
     gem_counts = {}
     for gem in gems:
-        name_html = gem.get("Name", "")
-
-        # BeautifulSoup으로 태그 제거
-        soup = BeautifulSoup(name_html, "html.parser")
-        clean_name = soup.get_text()
-
-        # "레벨"과 보석 종류 추출
-        if "레벨" in clean_name:
-            gem_level, gem_type = clean_name.split("레벨", 1)
-            gem_type = gem_type.split("의")[0].strip()  # 보석 종류 추출 ("멸화", "홍염" 등)
-            gem_level = gem_level.strip() + "레벨"  # 레벨 추가 ("7레벨", "8레벨" 등)
-
-            key = f"{gem_level} {gem_type}"
+        parsed = parse_gem_name(gem.get("Name") or "")
+        if parsed:
+            key = f"{parsed[0]} {parsed[1]}"
             gem_counts[key] = gem_counts.get(key, 0) + 1
 
     return gem_counts
 
 async def fetch_card_info(character_name: str, api_key: str):
     """로스트아크 API를 통해 카드 정보 가져오기"""
-    base_url = f"https://developer-lostark.game.onstove.com/armories/characters/{character_name}/cards"
-    headers = {"Authorization": f"Bearer {api_key}"}
+    try:
+        return await client.get(f"/armories/characters/{character_name}/cards", api_key=api_key)
+    except LostArkAPIError as e:
+        print(f"API 요청 실패: {e.status}")
+        return None
+    except Exception as e:
+        print(f"API 호출 중 오류 발생: {e}")
+        return None
 
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(base_url, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data
-                else:
-                    print(f"API 요청 실패: {response.status}")
-                    return None
-        except Exception as e:
-            print(f"API 호출 중 오류 발생: {e}")
-            return None
-
-async def fetch_auction_gem_data(level: int, gem_type: str):
-        """옥션 데이터를 검색합니다."""
-        url = "https://developer-lostark.game.onstove.com/auctions/items"
-        payload = {
+async def fetch_auction_gem_data(level: int, gem_type: str, limit: int = 5, page_no: int = 1,
+                                 sort_condition: str = "ASC"):
+        """
+        옥션 데이터를 검색합니다.
+        즉시 구매가 기준으로 정렬된 페이지에서 구매가가 없는 매물을 제외하고 앞의 limit개를 GemListing 목록으로 반환합니다.
+        """
+        path = "/auctions/items"
+        payload = normalize_payload({
             "ItemLevelMin": 0,
             "ItemLevelMax": 0,
             "Sort": "BUY_PRICE",
+            "SortCondition": sort_condition,
             "CategoryCode": 210000,  # 보석 카테고리 코드
             "ItemGradeQuality": 0,  # 품질
             "SkillOptions": [],
-            "ItemName": f"{level}레벨 {gem_type}"
-        }
+            "ItemName": f"{level}레벨 {gem_type}",
+            "PageNo": page_no
+        })
+
+        async def load():
+            data = await client.post(path, payload, error_message="Failed to fetch auction data")
+            # 페이지 전체 대신 필요한 필드만 캐시 (디스크 캐시에도 그대로 저장되도록 리스트로 보관)
+            listings = [
+                [item["Name"], item["AuctionInfo"]["BuyPrice"], item["AuctionInfo"].get("EndDate")]
+                for item in data.get("Items") or []
+                if item["AuctionInfo"].get("BuyPrice")
+            ]
+            return listings[:limit]
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=HEADERS, json=payload) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to fetch auction data: {response.status}")
-                return await response.json()
+        rows = await auction_cache.get(payload_key(path, payload) + (limit,), load)
+        return [GemListing(*row) for row in rows]
             
-async def fetch_markets_engraving_data(engraving_type: str):
+async def fetch_markets_engraving_data(engraving_type: str, page_no: int = 1):
         """마켓 데이터를 검색합니다."""
-        url = "https://developer-lostark.game.onstove.com/markets/items/"
+        path = "/markets/items/"
         payload = {
             "CategoryCode": 40000,
             "Sort": "CURRENT_MIN_PRICE",
             "ItemGrade": "유물",
             "ItemName": f"{engraving_type}",
-            "SortCondition": "DESC"
+            "SortCondition": "DESC",
+            "PageNo": page_no
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=HEADERS, json=payload) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to fetch auction data: {response.status}")
-                return await response.json()
+        return await post_market_query(market_cache, path, payload, "Failed to fetch auction data")
+
+async def fetch_market_pages(fetch_page, max_pages=20, concurrency=SWEEP_CONCURRENCY):
+    """
+    첫 페이지의 TotalCount/PageSize로 전체 페이지 수를 구한 뒤,
+    나머지 페이지를 최대 concurrency개씩 동시에 요청해 (합친 Items, 전체 TotalCount)를 반환합니다.
+    """
+    first = await fetch_page(1)
+    items = list(first.get("Items") or [])
+    page_size = first.get("PageSize") or len(items)
+    total_count = first.get("TotalCount") or 0
+    last_page = min(max_pages, -(-total_count // page_size)) if page_size else 1
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_limited(page_no):
+        async with semaphore:
+            return await fetch_page(page_no)
+
+    pages = await asyncio.gather(*[fetch_limited(page_no) for page_no in range(2, last_page + 1)])
+    for page in pages:
+        items.extend(page.get("Items") or [])
+    return items, total_count
+
+async def fetch_all_engraving_markets():
+        """유물 각인서 카테고리 전체 조회 결과 (이름별 최저가 아이템 목록, 짧은 TTL로 캐시)"""
+        async def load():
+            items, _ = await fetch_market_pages(lambda page_no: fetch_markets_engraving_data("", page_no))
+            # 페이지를 나눠 받는 사이 가격이 바뀌면 같은 아이템이 두 페이지에 나올 수 있으므로 이름 기준으로 합침
+            merged = {}
+            for item in items:
+                current = merged.get(item["Name"])
+                if current is None or item["CurrentMinPrice"] < current["CurrentMinPrice"]:
+                    merged[item["Name"]] = item
+            return list(merged.values())
+
+        return await sweep_cache.get(("engravings",), load)
 
 async def fetch_markets_enhance_data(item_name: str):
         """마켓 데이터를 검색합니다."""
-        url = "https://developer-lostark.game.onstove.com/markets/items/"
+        path = "/markets/items/"
         payload = {
             "CategoryCode": 50000,
             "Sort": "CURRENT_MIN_PRICE",
             "itemName": f"{item_name}"
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=HEADERS, json=payload) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to fetch auction data: {response.status}")
-                return await response.json()
+        return await post_market_query(market_cache, path, payload, "Failed to fetch auction data")
 
             
 async def fetch_accessory_data(item_grade_quality, category_code, item_grade, etc_options, page_no):
     """
     악세서리 검색 요청을 API에 보내고 결과를 반환합니다.
+    스냅샷(fetch_accessory_listings)과 같은 순서가 되도록 즉시 구매가 낮은 순으로 정렬합니다.
     """
-    url = "https://developer-lostark.game.onstove.com/auctions/items"
+    path = "/auctions/items"
     payload = {
+        "Sort": "BUY_PRICE",
+        "SortCondition": "ASC",
         "pageNo": page_no,
         "ItemGradeQuality": item_grade_quality,
         "CategoryCode": category_code,
         "ItemGrade": item_grade if item_grade else "",
         "ItemTier": 4,
-        "EtcOptions": etc_options
+        # 옵션 조건은 순서와 무관하므로 정렬해 같은 검색이 같은 캐시 키를 갖도록 함
+        "EtcOptions": sorted(
+            etc_options,
+            key=lambda option: (option["SecondOption"], option["MinValue"], option["MaxValue"])
+        )
     }
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, headers=HEADERS, json=payload) as response:
-            if response.status != 200:
-                raise Exception(f"Failed to fetch accessory data: {response.status}")
-            return await response.json()
+    return await post_market_query(accessory_cache, path, payload, "Failed to fetch accessory data")
+
+async def fetch_accessory_listings(category_code, max_pages=30):
+    """
+    악세서리 카테고리 매물을 즉시 구매가 낮은 순으로 최대 max_pages 페이지까지 수집해
+    (매물 목록, 전체 매물을 다 모았는지 여부)를 반환합니다.
+    스냅샷 수집용이라 검색 캐시를 거치지 않습니다.
+    """
+    path = "/auctions/items"
+
+    def fetch_page(page_no):
+        payload = {
+            "Sort": "BUY_PRICE",
+            "SortCondition": "ASC",
+            "CategoryCode": category_code,
+            "ItemTier": 4,
+            "ItemGradeQuality": 0,
+            "PageNo": page_no
+        }
+        return client.post(path, payload, error_message="Failed to fetch accessory data")
+
+    items, total_count = await fetch_market_pages(fetch_page, max_pages=max_pages)
+    return items, len(items) >= total_count
 
             
 
@@ -173,7 +439,10 @@ CARD_ABBREVIATIONS = {
 }
         
 def parse_card_info(cards):
-    """카드 정보 파싱"""
+    """카드 정보 파싱 (카드 정보 또는 통합 아머리 응답)"""
+    if cards and ARMORY_SECTIONS["cards"] in cards:  # 통합 아머리 응답이면 카드 섹션만 사용
+        cards = cards[ARMORY_SECTIONS["cards"]]
+
     if not cards or "Effects" not in cards or not cards["Effects"]:
         return "카드 정보 없음"
 
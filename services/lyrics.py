@@ -0,0 +1,60 @@
+import json
+from array import array
+from bisect import bisect_right
+
+
+class LyricsTimeline:
+    """
+    파싱된 자막 타임라인.
+    시작/종료 시각은 array('d')로, 텍스트는 리스트로 따로 보관하고 (시작 시각 순 정렬),
+    현재 줄은 커서를 한 칸씩 옮기거나 이진 탐색으로 찾습니다.
+    """
+
+    __slots__ = ("starts", "ends", "texts")
+
+    def __init__(self, starts=(), ends=(), texts=()):
+        lines = list(zip(starts, ends, texts))
+        if any(lines[i][0] > lines[i + 1][0] for i in range(len(lines) - 1)):
+            lines.sort(key=lambda line: line[0])
+        self.starts = array("d", (line[0] for line in lines))
+        self.ends = array("d", (line[1] for line in lines))
+        self.texts = [line[2] for line in lines]
+
+    def __len__(self):
+        return len(self.texts)
+
+    def lookup(self, current_time, cursor=0):
+        """
+        current_time에 표시할 (텍스트 또는 None, 새 커서) 반환.
+        재생 중에는 커서가 그대로이거나 한 칸 앞으로만 가므로 O(1), 그 외(처음/되감기 등)에는 이진 탐색
+        """
+        starts = self.starts
+        count = len(starts)
+        if not count:
+            return None, 0
+
+        if 0 <= cursor < count and starts[cursor] <= current_time \
+                and (cursor + 1 == count or current_time < starts[cursor + 1]):
+            index = cursor
+        elif cursor + 1 < count and starts[cursor + 1] <= current_time \
+                and (cursor + 2 == count or current_time < starts[cursor + 2]):
+            index = cursor + 1
+        else:
+            index = bisect_right(starts, current_time) - 1
+            if index < 0:
+                return None, 0
+
+        text = self.texts[index] if current_time <= self.ends[index] else None
+        return text, index
+
+    def to_record(self):
+        """DB 저장용 (시작 시각 bytes, 종료 시각 bytes, 텍스트 JSON)"""
+        return self.starts.tobytes(), self.ends.tobytes(), json.dumps(self.texts, ensure_ascii=False)
+
+    @classmethod
+    def from_record(cls, starts_blob, ends_blob, texts_json):
+        timeline = cls()
+        timeline.starts.frombytes(starts_blob)
+        timeline.ends.frombytes(ends_blob)
+        timeline.texts = json.loads(texts_json)
+        return timeline
@@ -0,0 +1,126 @@
+import asyncio
+import random
+import time
+
+
+class TokenBucket:
+    """
+    API 키 하나의 요청 예산을 관리하는 토큰 버킷.
+    토큰이 없으면 실패하지 않고 도착 순서(FIFO)대로 대기합니다.
+    """
+
+    def __init__(self, rate=100, per=60.0):
+        self.capacity = rate  # 최대 토큰 수 (기본: 분당 100회)
+        self.per = per
+        self.tokens = float(rate)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0  # 429/Reset 헤더로 인한 강제 대기 종료 시각
+        self._lock = asyncio.Lock()  # asyncio.Lock은 대기 순서를 보장 (공정한 큐)
+
+        # 통계
+        self.waiting = 0  # 현재 대기 중인 요청 수
+        self.total_requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.throttled = 0  # 429 응답 횟수
+
+    @property
+    def fill_rate(self):
+        return self.capacity / self.per
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.fill_rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        """토큰 하나를 얻을 때까지 대기하고, 대기한 시간(초)을 반환"""
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    if now < self.blocked_until:
+                        await asyncio.sleep(self.blocked_until - now)
+                        continue
+
+                    self._refill()
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        break
+                    await asyncio.sleep((1 - self.tokens) / self.fill_rate)
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - started
+        self.total_requests += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    def block(self, seconds):
+        """지정한 시간 동안 새 요청을 보내지 않도록 막음 (429 응답 시)"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers):
+        """X-RateLimit-* 응답 헤더로 버킷 상태 보정"""
+        try:
+            limit = headers.get("X-RateLimit-Limit")
+            remaining = headers.get("X-RateLimit-Remaining")
+            reset = headers.get("X-RateLimit-Reset")
+
+            if limit is not None and int(limit) > 0:
+                self.capacity = int(limit)
+
+            if remaining is not None:
+                self._refill()
+                self.tokens = min(self.tokens, float(remaining))
+
+                # 남은 예산이 없으면 Reset 시각(epoch 초)까지 대기
+                if int(remaining) <= 0 and reset is not None:
+                    self.block(max(0.0, float(reset) - time.time()))
+        except (TypeError, ValueError):
+            pass  # 헤더 형식이 예상과 다르면 무시
+
+    def stats(self):
+        """현재 대기열 길이와 대기 시간 통계"""
+        self._refill()
+        return {
+            "queue_depth": self.waiting,
+            "tokens": round(self.tokens, 1),
+            "capacity": self.capacity,
+            "requests": self.total_requests,
+            "throttled": self.throttled,
+            "avg_wait": self.total_wait / self.total_requests if self.total_requests else 0.0,
+            "max_wait": self.max_wait,
+            "blocked_for": max(0.0, self.blocked_until - time.monotonic()),
+        }
+
+
+class RateLimiter:
+    """API 키별 토큰 버킷 모음"""
+
+    def __init__(self, rate=100, per=60.0):
+        self.rate = rate
+        self.per = per
+        self.buckets = {}
+
+    def bucket(self, api_key):
+        if api_key not in self.buckets:
+            self.buckets[api_key] = TokenBucket(self.rate, self.per)
+        return self.buckets[api_key]
+
+
+def backoff_delay(attempt, base=0.5, cap=10.0):
+    """지수 백오프 + full jitter 대기 시간 계산"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def retry_after_seconds(headers):
+    """Retry-After 헤더(초)를 읽어 반환, 없으면 None"""
+    value = headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
@@ -0,0 +1,152 @@
+import asyncio
+import os
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+import yt_dlp
+from utils.json_loader import load_json
+from services.cache import AsyncTTLCache
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(BASE_DIR, "../../config/settings.json")
+config = load_json(CONFIG_PATH)
+
+# yt_dlp 추출 전용 스레드 수와 추출 1회 제한 시간(초)
+EXTRACT_WORKERS = 4
+EXTRACT_TIMEOUT = 20
+# 스레드 안의 네트워크 대기 제한 (응답 없는 연결이 제한 시간 뒤에도 스레드를 오래 붙잡지 않도록)
+EXTRACT_SOCKET_TIMEOUT = EXTRACT_TIMEOUT // 2
+
+# 한 번의 추출로 대기열/재생/가사에 필요한 정보를 모두 가져오는 옵션
+TRACK_OPTS = {
+    "format": "bestaudio/best",
+    "quiet": True,
+    "skip_download": True,
+    "writesubtitles": True,
+    "writeautomaticsub": True,
+    "subtitleslangs": ["ko", "en"],
+}
+CAPTION_LANGS = ("ko", "en")  # 자막 우선순위: 한국어 > 영어
+# 스트림 URL(googlevideo)은 몇 시간 뒤 만료되므로 그보다 짧게 재사용
+STREAM_TTL = 20 * 60
+
+# 현재 곡이 이 비율 지점을 지나거나 끝나기 N초 전이 되면 다음 곡을 미리 추출 (settings.json의 music에서 설정)
+MUSIC_CONFIG = config.get("music", {})
+PRERESOLVE_RATIO = MUSIC_CONFIG.get("preresolve_ratio", 0.7)
+PRERESOLVE_BEFORE_END = MUSIC_CONFIG.get("preresolve_before_end", 30)
+# 미리 추출한 스트림이 쓰이기 전에 만료되지 않도록, 곡이 길어도 이보다 일찍 추출하지 않음
+PRERESOLVE_MAX_LEAD = STREAM_TTL / 2
+
+_executor = ThreadPoolExecutor(max_workers=EXTRACT_WORKERS, thread_name_prefix="yt_dlp")
+
+
+def _extract(url, ydl_opts, timeout):
+    started = time.monotonic()
+    try:
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            return ydl.extract_info(url, download=False)
+    finally:
+        elapsed = time.monotonic() - started
+        if elapsed > timeout:
+            print(f"⚠️ yt_dlp 추출이 제한 시간({timeout}초)을 넘겨 {elapsed:.1f}초 동안 스레드를 사용했습니다: {url}")
+
+
+async def extract_info(url, ydl_opts, timeout=EXTRACT_TIMEOUT):
+    """
+    yt_dlp extract_info를 전용 스레드 풀에서 실행합니다 (이벤트 루프를 막지 않음).
+    timeout을 넘기면 asyncio.TimeoutError, 호출자가 취소되면 아직 시작되지 않은 추출은 함께 취소됩니다.
+    이미 실행 중인 추출은 중단할 수 없어 timeout 뒤에도 스레드에서 계속 돌고, 그동안 다른 추출은 빈 스레드를 기다립니다.
+    그래서 네트워크 대기를 socket_timeout으로 제한하고, 제한 시간을 넘긴 추출은 로그로 남깁니다.
+    """
+    ydl_opts = {"socket_timeout": EXTRACT_SOCKET_TIMEOUT, **ydl_opts}
+    loop = asyncio.get_running_loop()
+    return await asyncio.wait_for(loop.run_in_executor(_executor, _extract, url, ydl_opts, timeout), timeout)
+
+
+def should_preresolve(elapsed, duration):
+    """다음 곡을 미리 추출할 시점인지 확인 (라이브 등 길이를 모르는 곡은 미리 추출하지 않음)"""
+    if duration <= 0:
+        return False
+    remaining = duration - elapsed
+    return remaining <= min(duration * (1 - PRERESOLVE_RATIO), PRERESOLVE_MAX_LEAD) or remaining <= PRERESOLVE_BEFORE_END
+
+
+def video_id_of(url):
+    """유튜브 URL의 영상 ID (watch?v=..., youtu.be/...), 알 수 없으면 None"""
+    parsed = urllib.parse.urlparse(url)
+    if parsed.hostname and parsed.hostname.endswith("youtu.be"):
+        return parsed.path.lstrip("/") or None
+    return urllib.parse.parse_qs(parsed.query).get("v", [None])[0]
+
+
+def caption_tracks(info):
+    """{언어: 자막 URL} (수동 자막 > 자동 자막, json3 형식 우선)"""
+    subtitles = info.get("subtitles") or {}
+    automatic = info.get("automatic_captions") or {}
+    tracks = {}
+    for lang in CAPTION_LANGS:
+        formats = subtitles.get(lang) or automatic.get(lang)
+        if formats:
+            preferred = next((fmt for fmt in formats if fmt.get("ext") == "json3"), formats[0])
+            tracks[lang] = preferred["url"]
+    return tracks
+
+
+class TrackResolver:
+    """
+    곡 URL -> 트랙 정보 (제목, 길이, 썸네일, 오디오 URL, 자막 URL).
+    - extract_info 한 번으로 대기열 추가/재생/가사에 필요한 정보를 모두 얻음
+    - 스트림 URL이 포함된 트랙 정보는 STREAM_TTL 동안 메모리에서 재사용
+    - 제목/길이/썸네일/자막 여부는 음악 DB(track_meta)에 영상 ID로 저장해, 자주 듣는 곡은 대기열 추가 시 yt_dlp를 건너뜀
+    """
+
+    def __init__(self, database=None, stream_ttl=STREAM_TTL, maxsize=256):
+        self.database = database
+        self._streams = AsyncTTLCache("streams", ttl=stream_ttl, maxsize=maxsize)
+
+    async def resolve(self, url):
+        """재생용 트랙 정보 반환 (같은 곡을 동시에 요청하면 추출은 한 번만 수행)"""
+        return await self._streams.get(video_id_of(url) or url, lambda: self._extract_track(url))
+
+    async def get_metadata(self, url):
+        """대기열 표시용 곡 정보 (title, duration, thumbnail, has_captions), 저장된 정보가 있으면 추출하지 않음"""
+        video_id = video_id_of(url)
+        if video_id and self.database is not None:
+            meta = await self.database.get_track_meta(video_id)
+            if meta is not None:
+                return meta
+
+        track = await self.resolve(url)
+        return {
+            "video_id": track["video_id"],
+            "title": track["title"],
+            "duration": track["duration"],
+            "thumbnail": track["thumbnail"],
+            "has_captions": bool(track["captions"]),
+        }
+
+    async def _extract_track(self, url):
+        info = await extract_info(url, TRACK_OPTS)
+        track = {
+            "video_id": info.get("id") or video_id_of(url),
+            "url": url,
+            "title": info.get("title", "알 수 없는 제목"),
+            "duration": info.get("duration") or 0,
+            "thumbnail": info.get("thumbnail"),
+            "audio_url": info.get("url"),
+            "captions": caption_tracks(info),
+        }
+        if self.database is not None and track["video_id"]:
+            await self.database.save_track_meta(
+                track["video_id"], track["title"], track["duration"], track["thumbnail"], bool(track["captions"])
+            )
+        return track
+
+    def invalidate(self, url):
+        """스트림 URL이 만료된 경우 등 다시 추출하도록 제거"""
+        self._streams.invalidate(video_id_of(url) or url)
+
+
+def shutdown():
+    """대기 중인 추출 작업 취소 (봇 종료 시 호출)"""
+    _executor.shutdown(wait=False, cancel_futures=True)
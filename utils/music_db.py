@@ -1,8 +1,10 @@
 import aiosqlite
+import time
 
 class Database:
-    def __init__(self, db_file):
+    def __init__(self, db_file, max_track_meta=2000):
         self.db_file = db_file
+        self.max_track_meta = max_track_meta  # 곡 정보 캐시 최대 개수 (오래 안 쓴 순으로 삭제)
 
     async def initialize(self):
         """데이터베이스 초기화"""
@@ -16,6 +18,29 @@ class Database:
                     requester TEXT NOT NULL
                 )
             """)
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS track_meta (
+                    video_id TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    duration INTEGER NOT NULL,
+                    thumbnail TEXT,
+                    has_captions INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            await db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_track_meta_last_used ON track_meta (last_used)
+            """)
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS lyrics (
+                    video_id TEXT NOT NULL,
+                    lang TEXT NOT NULL,
+                    starts BLOB NOT NULL,
+                    ends BLOB NOT NULL,
+                    texts TEXT NOT NULL,
+                    PRIMARY KEY (video_id, lang)
+                ) WITHOUT ROWID
+            """)
             await db.commit()
             print("✅ 데이터베이스가 초기화되었습니다.")
 
@@ -63,6 +88,28 @@ class Database:
                 print(f"❌ 다음 곡 가져오기 중 오류 발생: {e}")
                 return None
 
+    async def peek_next_song(self, guild_id):
+        """다음 곡 조회 (대기열에서 삭제하지 않음)"""
+        async with aiosqlite.connect(self.db_file) as db:
+            try:
+                cursor = await db.execute("""
+                    SELECT id, url, title, requester FROM songs
+                    WHERE guild_id = ?
+                    ORDER BY id LIMIT 1
+                """, (guild_id,))
+                song = await cursor.fetchone()
+                if not song:
+                    return None
+                return {
+                    "id": song[0],
+                    "url": song[1],
+                    "title": song[2],
+                    "requester": song[3]
+                }
+            except Exception as e:
+                print(f"❌ 다음 곡 조회 중 오류 발생: {e}")
+                return None
+
     async def get_queue(self, guild_id):
         """대기열 가져오기"""
         async with aiosqlite.connect(self.db_file) as db:
@@ -105,6 +152,80 @@ class Database:
             except Exception as e:
                 print(f"❌ 곡 제거 중 오류 발생: {e}")
 
+    async def get_track_meta(self, video_id):
+        """영상 ID로 저장된 곡 정보 조회 (조회 시각 갱신), 없으면 None"""
+        async with aiosqlite.connect(self.db_file) as db:
+            try:
+                cursor = await db.execute("""
+                    SELECT title, duration, thumbnail, has_captions FROM track_meta
+                    WHERE video_id = ?
+                """, (video_id,))
+                row = await cursor.fetchone()
+                if not row:
+                    return None
+
+                await db.execute("""
+                    UPDATE track_meta SET last_used = ? WHERE video_id = ?
+                """, (time.time(), video_id))
+                await db.commit()
+                return {
+                    "video_id": video_id,
+                    "title": row[0],
+                    "duration": row[1],
+                    "thumbnail": row[2],
+                    "has_captions": bool(row[3])
+                }
+            except Exception as e:
+                print(f"❌ 곡 정보 조회 중 오류 발생: {e}")
+                return None
+
+    async def save_track_meta(self, video_id, title, duration, thumbnail, has_captions):
+        """곡 정보 저장 후, 최대 개수를 넘으면 가장 오래 사용하지 않은 곡부터 삭제"""
+        async with aiosqlite.connect(self.db_file) as db:
+            try:
+                await db.execute("""
+                    INSERT OR REPLACE INTO track_meta (video_id, title, duration, thumbnail, has_captions, last_used)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (video_id, title, duration, thumbnail, int(has_captions), time.time()))
+                await db.execute("""
+                    DELETE FROM track_meta WHERE video_id IN (
+                        SELECT video_id FROM track_meta
+                        ORDER BY last_used DESC
+                        LIMIT -1 OFFSET ?
+                    )
+                """, (self.max_track_meta,))
+                # 곡 정보가 삭제된 곡의 가사도 함께 정리
+                await db.execute("""
+                    DELETE FROM lyrics WHERE video_id NOT IN (SELECT video_id FROM track_meta)
+                """)
+                await db.commit()
+            except Exception as e:
+                print(f"❌ 곡 정보 저장 중 오류 발생: {e}")
+
+    async def get_lyrics(self, video_id, lang):
+        """파싱된 가사 (시작 시각 bytes, 종료 시각 bytes, 텍스트 JSON) 조회, 없으면 None"""
+        async with aiosqlite.connect(self.db_file) as db:
+            try:
+                async with db.execute("""
+                    SELECT starts, ends, texts FROM lyrics WHERE video_id = ? AND lang = ?
+                """, (video_id, lang)) as cursor:
+                    return await cursor.fetchone()
+            except Exception as e:
+                print(f"❌ 가사 조회 중 오류 발생: {e}")
+                return None
+
+    async def save_lyrics(self, video_id, lang, starts, ends, texts):
+        """파싱된 가사 저장"""
+        async with aiosqlite.connect(self.db_file) as db:
+            try:
+                await db.execute("""
+                    INSERT OR REPLACE INTO lyrics (video_id, lang, starts, ends, texts)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (video_id, lang, starts, ends, texts))
+                await db.commit()
+            except Exception as e:
+                print(f"❌ 가사 저장 중 오류 발생: {e}")
+
     async def clear_songs(self, guild_id=None):
         """곡 데이터 초기화 (특정 서버 또는 전체)"""
         async with aiosqlite.connect(self.db_file) as db:
@@ -0,0 +1,150 @@
+import sqlite3
+import time
+
+# 일 단위 집계는 한국 시간(KST) 자정 기준
+KST_OFFSET = 9 * 3600
+
+
+def hour_bucket(ts):
+    return ts - ts % 3600
+
+
+def day_bucket(ts):
+    return (ts + KST_OFFSET) // 86400 * 86400 - KST_OFFSET
+
+
+class PriceHistoryDatabase:
+    """
+    품목별 시세 시계열 저장소.
+    원본 샘플은 (item_id, ts) 기본키 순으로 저장되고, 저장 시점에 시간/일 단위 집계 테이블을 함께 갱신하므로
+    조회는 항상 기본키 범위 검색만 사용합니다.
+    """
+
+    def __init__(self, db_path="price_history.db", raw_retention_days=7, hourly_retention_days=90):
+        self.conn = sqlite3.connect(db_path)
+        self.cursor = self.conn.cursor()
+        self.raw_retention = raw_retention_days * 86400
+        self.hourly_retention = hourly_retention_days * 86400
+        self._item_ids = {}
+        self.create_tables()
+
+    def create_tables(self):
+        """테이블 생성"""
+        self.cursor.execute("PRAGMA journal_mode=WAL")
+        self.cursor.execute("""
+        CREATE TABLE IF NOT EXISTS price_items (
+            item_id INTEGER PRIMARY KEY,
+            item_key TEXT NOT NULL UNIQUE
+        )
+        """)
+        self.cursor.execute("""
+        CREATE TABLE IF NOT EXISTS price_samples (
+            item_id INTEGER NOT NULL,
+            ts INTEGER NOT NULL,
+            price INTEGER NOT NULL,
+            PRIMARY KEY (item_id, ts)
+        ) WITHOUT ROWID
+        """)
+        for table in ("price_hourly", "price_daily"):
+            self.cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                item_id INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                min_price INTEGER NOT NULL,
+                max_price INTEGER NOT NULL,
+                sum_price INTEGER NOT NULL,
+                samples INTEGER NOT NULL,
+                PRIMARY KEY (item_id, bucket)
+            ) WITHOUT ROWID
+            """)
+        self.conn.commit()
+
+    def get_item_id(self, item_key, create=False):
+        """품목 키("gem:10:겁화", "engraving:원한" 등)의 ID 조회"""
+        if item_key in self._item_ids:
+            return self._item_ids[item_key]
+
+        if create:
+            self.cursor.execute("""
+            INSERT OR IGNORE INTO price_items (item_key) VALUES (?)
+            """, (item_key,))
+        self.cursor.execute("""
+        SELECT item_id FROM price_items WHERE item_key = ?
+        """, (item_key,))
+        row = self.cursor.fetchone()
+        if row:
+            self._item_ids[item_key] = row[0]
+            return row[0]
+        return None
+
+    def add_samples(self, samples, ts=None):
+        """{품목 키: 가격} 시세를 한 번에 저장하고 집계 테이블 갱신"""
+        ts = int(time.time() if ts is None else ts)
+        rows = [(self.get_item_id(item_key, create=True), price) for item_key, price in samples.items()]
+
+        self.cursor.executemany("""
+        INSERT OR REPLACE INTO price_samples (item_id, ts, price) VALUES (?, ?, ?)
+        """, [(item_id, ts, price) for item_id, price in rows])
+        for table, bucket in (("price_hourly", hour_bucket(ts)), ("price_daily", day_bucket(ts))):
+            self.cursor.executemany(f"""
+            INSERT INTO {table} (item_id, bucket, min_price, max_price, sum_price, samples)
+            VALUES (?, ?, ?, ?, ?, 1)
+            ON CONFLICT (item_id, bucket) DO UPDATE SET
+                min_price = MIN(min_price, excluded.min_price),
+                max_price = MAX(max_price, excluded.max_price),
+                sum_price = sum_price + excluded.sum_price,
+                samples = samples + 1
+            """, [(item_id, bucket, price, price, price) for item_id, price in rows])
+        self.conn.commit()
+
+    def get_summary(self, item_key, days):
+        """최근 N일의 (최저가, 평균가, 최고가, 샘플 수), 기록이 없으면 None"""
+        item_id = self.get_item_id(item_key)
+        if item_id is None:
+            return None
+
+        since = int(time.time()) - days * 86400
+        # 시간 단위 집계는 보존 기간 안에서만 정확하므로, 그보다 길면 일 단위 집계 사용
+        table, start = ("price_hourly", hour_bucket(since)) if days * 86400 <= self.hourly_retention \
+            else ("price_daily", day_bucket(since))
+        self.cursor.execute(f"""
+        SELECT MIN(min_price), SUM(sum_price), MAX(max_price), SUM(samples)
+        FROM {table}
+        WHERE item_id = ? AND bucket >= ?
+        """, (item_id, start))
+        min_price, sum_price, max_price, samples = self.cursor.fetchone()
+        if not samples:
+            return None
+        return min_price, sum_price / samples, max_price, samples
+
+    def get_daily(self, item_key, days):
+        """최근 N일의 일별 [(날짜 시작 ts, 최저가, 평균가, 최고가)]"""
+        item_id = self.get_item_id(item_key)
+        if item_id is None:
+            return []
+
+        start = day_bucket(int(time.time()) - (days - 1) * 86400)
+        self.cursor.execute("""
+        SELECT bucket, min_price, sum_price * 1.0 / samples, max_price
+        FROM price_daily
+        WHERE item_id = ? AND bucket >= ?
+        ORDER BY bucket
+        """, (item_id, start))
+        return self.cursor.fetchall()
+
+    def prune(self):
+        """보존 기간이 지난 원본 샘플과 시간 단위 집계 삭제 (품목별 기본키 범위 삭제)"""
+        now = int(time.time())
+        self.cursor.execute("SELECT item_id FROM price_items")
+        item_ids = [row[0] for row in self.cursor.fetchall()]
+        self.cursor.executemany("""
+        DELETE FROM price_samples WHERE item_id = ? AND ts < ?
+        """, [(item_id, now - self.raw_retention) for item_id in item_ids])
+        self.cursor.executemany("""
+        DELETE FROM price_hourly WHERE item_id = ? AND bucket < ?
+        """, [(item_id, now - self.hourly_retention) for item_id in item_ids])
+        self.conn.commit()
+
+    def close(self):
+        """데이터베이스 연결 닫기"""
+        self.conn.close()